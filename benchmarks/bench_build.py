@@ -0,0 +1,170 @@
+"""Time the phases of a build on synthetic catalogs of increasing size.
+
+For every scale a catalog is generated with ``benchmarks.corpus`` and the
+following are timed separately:
+
+* ``on_files``: a cold build of all files with a fresh plugin instance
+* ``_generate_markdown_content``: rendering the parsed resources of all files
+* ``_make_graph_from_tasks``: building the graphs of all pipelines
+* ``_update_navigation``: building the navigation of the whole catalog
+
+Every timing is the best of ``--repeat`` runs. Results are written as JSON
+so runs of different versions can be compared.
+
+    python -m benchmarks.bench_build --scales 100 1000 --output build.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import yaml
+from mkdocs.structure.files import File, Files
+from src.visualizer import PLUGIN_VERSION, PipelineVisualizer
+from src.writer import MarkdownWriter
+from src.model import Pipeline
+from benchmarks.corpus import CorpusSpec, generate_corpus
+
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def make_plugin(plugin_config):
+    plugin = PipelineVisualizer()
+    plugin.load_config(dict(plugin_config, log_level="ERROR"))
+    plugin.on_config({})
+    plugin.logger.setLevel(logging.ERROR)
+    return plugin
+
+
+def best_of(repeat, run, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def remove_generated_pages(docs_dir):
+    for directory, _, file_names in os.walk(docs_dir):
+        for file_name in file_names:
+            if file_name.endswith(".md"):
+                os.unlink(os.path.join(directory, file_name))
+
+
+def bench_scale(file_count, seed, repeat, plugin_config):
+    docs_dir = tempfile.mkdtemp(prefix="pipeline-visualizer-bench-")
+    try:
+        spec = CorpusSpec(file_count, seed=seed)
+        paths = generate_corpus(docs_dir, spec)
+        site_dir = os.path.join(docs_dir, "site")
+
+        def config():
+            return {
+                "docs_dir": docs_dir,
+                "site_dir": site_dir,
+                "use_directory_urls": False,
+                "nav": [],
+            }
+
+        files = [File(path, docs_dir, site_dir, False) for path in paths]
+        plugin = make_plugin(plugin_config)
+
+        def build():
+            nonlocal plugin
+            plugin = make_plugin(plugin_config)
+            plugin.on_files(Files(files), config())
+
+        timings = {
+            "on_files": best_of(repeat, build, lambda: remove_generated_pages(docs_dir))
+        }
+
+        documents = []
+        for path in paths:
+            with open(os.path.join(docs_dir, path)) as f:
+                documents.append(list(yaml.load_all(f, Loader=Loader)))
+        pipelines = [
+            Pipeline(doc)
+            for resources in documents
+            for doc in resources
+            if doc.get("kind") == "Pipeline"
+        ]
+
+        renderer = make_plugin(plugin_config)
+        timings["_generate_markdown_content"] = best_of(
+            repeat,
+            lambda: [renderer._generate_markdown_content(r) for r in documents],
+        )
+        timings["_make_graph_from_tasks"] = best_of(
+            repeat,
+            lambda: [
+                renderer._make_graph_from_tasks(MarkdownWriter(), p.tasks, p.final)
+                for p in pipelines
+            ],
+        )
+        timings["_update_navigation"] = best_of(
+            repeat,
+            lambda: plugin._update_navigation(
+                [], plugin.pipeline_versions, plugin.task_versions
+            ),
+        )
+        return {
+            "files": len(paths),
+            "pipelines": len(pipelines),
+            "bytes": sum(os.path.getsize(os.path.join(docs_dir, p)) for p in paths),
+            "corpus": spec.to_dict(),
+            "timings": timings,
+        }
+    finally:
+        shutil.rmtree(docs_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--config",
+        type=json.loads,
+        default={},
+        help="plugin configuration as JSON, e.g. '{\"workers\": 4}'",
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {
+        "plugin_version": PLUGIN_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "config": args.config,
+        "scales": [],
+    }
+    for file_count in args.scales:
+        result = bench_scale(file_count, args.seed, args.repeat, args.config)
+        results["scales"].append(result)
+        for name, seconds in result["timings"].items():
+            print(
+                f"{result['files']:>6} files {name:<28} {seconds * 1000:10.2f} ms",
+                file=sys.stderr,
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare MarkdownWriter with repeated string concatenation.
+
+Renders a synthetic task with large scripts through the plugin and its
+template, once with MarkdownWriter and once with a writer that accumulates
+the page with ``+=`` like the renderers used to.
+
+Only a task page is rendered: the task sections of pipeline pages come from
+the ``tasks`` macro of ``pipeline.md.j2``, which Jinja2 joins itself, so the
+writer receives a few large fragments and both strategies take the same time.
+
+    python -m benchmarks.bench_markdown_writer
+"""
+
+import timeit
+import logging
+from src.visualizer import PipelineVisualizer
+from src.writer import MarkdownWriter
+from src.model import load_resource
+
+
+class ConcatWriter(MarkdownWriter):
+    def __init__(self):
+        super().__init__()
+        self.value = ""
+        self.write = self._concat
+
+    def _concat(self, fragment):
+        # Keep another reference so CPython cannot resize the string in place,
+        # as happens when the result is passed between methods
+        previous = self.value
+        self.value = previous + fragment
+
+    def getvalue(self):
+        return self.value
+
+
+def make_task(step_count, script_lines):
+    script = "\n".join(f"echo line {i}" for i in range(script_lines))
+    return {
+        "kind": "Task",
+        "metadata": {"name": "big-task"},
+        "spec": {
+            "steps": [
+                {"name": f"step-{i}", "image": "alpine", "script": script}
+                for i in range(step_count)
+            ]
+        },
+    }
+
+
+def main():
+    plugin = PipelineVisualizer()
+    plugin.load_config({"log_level": "ERROR"})
+    plugin.on_config({})
+    plugin.logger.setLevel(logging.ERROR)
+
+    label = "task, 200 steps x 500 script lines"
+    resource = load_resource(make_task(200, 500))
+    for writer_cls in [ConcatWriter, MarkdownWriter]:
+
+        def render():
+            out = writer_cls()
+            plugin._write_markdown_content(out, [resource])
+            return out.getvalue()
+
+        seconds = min(timeit.repeat(render, number=5, repeat=3)) / 5
+        print(f"{label:<36} {writer_cls.__name__:<15} {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
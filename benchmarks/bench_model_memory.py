@@ -0,0 +1,77 @@
+"""Compare the memory held by parsed YAML dicts and by the resource model.
+
+Generates a synthetic catalog, parses every file and keeps either the raw
+``yaml.load_all`` dict trees or the ``src.model`` objects built from them,
+as the renderers used to and do now. Memory is measured with tracemalloc.
+
+    python -m benchmarks.bench_model_memory --files 2000
+"""
+
+import os
+import gc
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import yaml
+from src.model import load_resource
+from benchmarks.corpus import CorpusSpec, generate_corpus
+
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def load_dicts(paths):
+    resources = []
+    for path in paths:
+        with open(path) as f:
+            resources.append(list(yaml.load_all(f, Loader=Loader)))
+    return resources
+
+
+def load_models(paths):
+    resources = []
+    for path in paths:
+        with open(path) as f:
+            resources.append(
+                [load_resource(doc) for doc in yaml.load_all(f, Loader=Loader)]
+            )
+    return resources
+
+
+def measure(load, paths):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    resources = load(paths)
+    seconds = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resources
+    return retained, peak, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="pipeline-visualizer-bench-")
+    try:
+        paths = [
+            os.path.join(root, path)
+            for path in generate_corpus(root, CorpusSpec(args.files, seed=args.seed))
+        ]
+        for label, load in [("dicts", load_dicts), ("model", load_models)]:
+            retained, peak, seconds = measure(load, paths)
+            print(
+                f"{label:<6} retained {retained / 2**20:8.1f} MiB"
+                f"  peak {peak / 2**20:8.1f} MiB  {seconds:6.2f} s"
+            )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
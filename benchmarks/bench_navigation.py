@@ -0,0 +1,92 @@
+"""Compare the indexed navigation builder with the previous linear one.
+
+Builds the navigation of a synthetic catalog of 10,000 resources grouped
+in nested folders, most with several versions, once with the plugin and
+once with a copy of the list scanning implementation it replaced.
+
+    python -m benchmarks.bench_navigation
+"""
+
+import os
+import timeit
+import logging
+from packaging import version
+from src.visualizer import PipelineVisualizer
+
+
+def make_versions(resource_count, group_count=20, version_count=3):
+    """Resources spread over nested groups, two out of three versioned."""
+    versions = {}
+    for i in range(resource_count):
+        group = i % group_count
+        group_path = os.path.join("catalog", f"team-{group % 4}", f"group-{group}")
+        name = f"resource-{i}"
+        versions.setdefault(group_path, {})[name] = [
+            (f"1.{v}", f"{group_path}/{name}-1.{v}.md")
+            for v in range(1 + i % version_count)
+        ]
+    return versions
+
+
+def linear_add_to_nav(nav_list, versions_dict):
+    """The navigation builder before it was indexed."""
+
+    def semantic_version_key(version_tuple):
+        ver, _ = version_tuple
+        try:
+            return version.parse(ver)
+        except version.InvalidVersion:
+            return version.parse("0.0.0")
+
+    def find_or_create_nested_dict(current_level, path_parts):
+        for part in path_parts:
+            for item in current_level:
+                if isinstance(item, dict) and part in item:
+                    current_level = item[part]
+                    break
+            else:
+                new_dict = {part: []}
+                current_level.append(new_dict)
+                current_level = new_dict[part]
+        return current_level
+
+    for group_path, resources in versions_dict.items():
+        current_level = find_or_create_nested_dict(nav_list, group_path.split(os.sep))
+        for resource_name, versions in resources.items():
+            versions = sorted(versions, key=semantic_version_key, reverse=True)
+            if len(versions) == 1:
+                current_level.append({resource_name: versions[0][1]})
+                continue
+            resource_versions = [{f"{resource_name} v{v}": p} for v, p in versions]
+            existing_entry = next(
+                (
+                    item
+                    for item in current_level
+                    if isinstance(item, dict) and resource_name in item
+                ),
+                None,
+            )
+            if existing_entry:
+                existing_entry[resource_name].extend(resource_versions)
+            else:
+                current_level.append({resource_name: resource_versions})
+
+
+def main():
+    plugin = PipelineVisualizer()
+    plugin.load_config({"log_level": "ERROR"})
+    plugin.on_config({})
+    plugin.logger.setLevel(logging.ERROR)
+
+    for resource_count in [1000, 10000]:
+        versions = make_versions(resource_count)
+        for label, build in [
+            ("linear", lambda: linear_add_to_nav([], versions)),
+            ("indexed", lambda: plugin._update_navigation([], versions, {})),
+        ]:
+            seconds = min(timeit.repeat(build, number=3, repeat=3)) / 3
+            print(f"{resource_count:>6} resources {label:<8} {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
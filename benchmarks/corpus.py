@@ -0,0 +1,193 @@
+"""Seeded generator of synthetic Tekton catalogs.
+
+The same seed and parameters always produce the same files, so timings of
+different plugin versions are measured on identical input.
+
+    python -m benchmarks.corpus /tmp/catalog --files 1000 --seed 1
+"""
+
+import os
+import random
+import argparse
+import yaml
+
+Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+SCRIPT_COMMANDS = [
+    "echo building $(params.revision)",
+    "make -j4 test",
+    'cp -r "$(workspaces.source.path)/dist" /tmp/out',
+    "go test ./... -count=1",
+    "curl -sSfL https://example.com/install.sh | sh",
+]
+
+
+class CorpusSpec:
+    """Shape of a generated catalog, ranges are inclusive ``(low, high)``."""
+
+    def __init__(
+        self,
+        files,
+        seed=0,
+        pipeline_ratio=0.3,
+        tasks_per_pipeline=(3, 30),
+        fan_in=(1, 3),
+        steps_per_task=(1, 6),
+        script_lines=(1, 80),
+        multi_doc_ratio=0.1,
+        versions=(1, 4),
+        group_depth=2,
+        group_fanout=6,
+    ):
+        self.files = files
+        self.seed = seed
+        self.pipeline_ratio = pipeline_ratio
+        self.tasks_per_pipeline = tasks_per_pipeline
+        self.fan_in = fan_in
+        self.steps_per_task = steps_per_task
+        self.script_lines = script_lines
+        self.multi_doc_ratio = multi_doc_ratio
+        self.versions = versions
+        self.group_depth = group_depth
+        self.group_fanout = group_fanout
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def _metadata(name, resource_version):
+    metadata = {"name": name}
+    if resource_version:
+        metadata["labels"] = {"app.kubernetes.io/version": resource_version}
+    return metadata
+
+
+def make_task(rng, spec, name, resource_version):
+    steps = []
+    for i in range(rng.randint(*spec.steps_per_task)):
+        lines = rng.randint(*spec.script_lines)
+        script = "\n".join(
+            ["#!/usr/bin/env bash", "set -euo pipefail"]
+            + [rng.choice(SCRIPT_COMMANDS) for _ in range(lines)]
+        )
+        steps.append(
+            {
+                "name": f"step-{i}",
+                "image": f"registry.example.com/tools/image-{rng.randint(0, 40)}:1.{i}",
+                "script": script,
+                "env": [{"name": "HOME", "value": "/tekton/home"}],
+            }
+        )
+    return {
+        "apiVersion": "tekton.dev/v1",
+        "kind": "Task",
+        "metadata": _metadata(name, resource_version),
+        "spec": {
+            "description": f"Synthetic task {name}",
+            "params": [
+                {"name": "revision", "type": "string", "default": "main"},
+                {"name": "flags", "type": "array", "default": []},
+            ],
+            "workspaces": [{"name": "source"}],
+            "results": [{"name": "digest", "description": "Image digest"}],
+            "steps": steps,
+        },
+    }
+
+
+def make_pipeline(rng, spec, name, resource_version, task_names):
+    tasks = []
+    for i in range(rng.randint(*spec.tasks_per_pipeline)):
+        task = {
+            "name": f"task-{i}",
+            "taskRef": {"name": rng.choice(task_names)},
+            "params": [{"name": "revision", "value": "$(params.revision)"}],
+            "workspaces": [{"name": "source", "workspace": "shared"}],
+        }
+        if i:
+            # Depend on up to fan_in of the previous tasks
+            fan_in = min(i, rng.randint(*spec.fan_in))
+            task["runAfter"] = [
+                f"task-{j}" for j in sorted(rng.sample(range(i), fan_in))
+            ]
+        tasks.append(task)
+    return {
+        "apiVersion": "tekton.dev/v1",
+        "kind": "Pipeline",
+        "metadata": _metadata(name, resource_version),
+        "spec": {
+            "params": [{"name": "revision", "description": "Git revision"}],
+            "workspaces": [{"name": "shared"}],
+            "tasks": tasks,
+            "finally": [{"name": "notify", "taskRef": {"name": task_names[0]}}],
+        },
+    }
+
+
+def generate_corpus(root, spec):
+    """Write the catalog described by ``spec`` below ``root``.
+
+    Returns the paths of the written files relative to ``root``.
+    """
+    rng = random.Random(spec.seed)
+    pipeline_files = int(spec.files * spec.pipeline_ratio)
+    task_files = spec.files - pipeline_files
+    task_names = [f"task-{i}" for i in range(max(1, task_files // 2))]
+
+    def group_dir():
+        parts = [
+            f"group-{rng.randrange(spec.group_fanout)}" for _ in range(spec.group_depth)
+        ]
+        return os.path.join(*parts) if parts else ""
+
+    paths = []
+
+    def write(kind, count, make):
+        written = 0
+        index = 0
+        while written < count:
+            name = f"{kind}-{index}"
+            directory = os.path.join(group_dir(), f"{kind}s")
+            version_count = rng.randint(*spec.versions)
+            for v in range(min(version_count, count - written)):
+                resource_version = f"0.{v + 1}" if version_count > 1 else ""
+                documents = [make(name, resource_version)]
+                if rng.random() < spec.multi_doc_ratio:
+                    documents.append(
+                        {
+                            "apiVersion": "v1",
+                            "kind": "ConfigMap",
+                            "metadata": {"name": f"{name}-config"},
+                            "data": {"key": "value"},
+                        }
+                    )
+                file_name = f"{name}-{resource_version or 'latest'}.yaml"
+                path = os.path.join(directory, file_name)
+                os.makedirs(os.path.join(root, directory), exist_ok=True)
+                with open(os.path.join(root, path), "w") as f:
+                    yaml.dump_all(documents, f, Dumper=Dumper, sort_keys=False)
+                paths.append(path)
+                written += 1
+            index += 1
+
+    write("task", task_files, lambda n, v: make_task(rng, spec, n, v))
+    write(
+        "pipeline",
+        pipeline_files,
+        lambda n, v: make_pipeline(rng, spec, n, v, task_names),
+    )
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    paths = generate_corpus(args.root, CorpusSpec(args.files, seed=args.seed))
+    print(f"Wrote {len(paths)} files to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/obegron/mkdocs-pipeline-visualizer",
     packages=find_packages(),
+    package_data={"src": ["templates/*.j2"]},
     author="Christer Grönblad",
     install_requires=["mkdocs"],
     entry_points={
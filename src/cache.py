@@ -0,0 +1,124 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+
+# Bump when the layout of cached records, or the values stored in them, change.
+CACHE_FORMAT = 6
+
+
+def render_key(data, settings_digest):
+    """Return the content address of a YAML source rendered with given settings."""
+    digest = hashlib.sha256(settings_digest.encode("utf-8"))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """On-disk cache of rendered pages keyed by source bytes and render settings.
+
+    Entries are stored as JSON files named after their key. The cache is wiped
+    when the plugin version (or cache format) differs from the one that wrote
+    it, and trimmed to ``max_size`` bytes by evicting least recently used
+    entries.
+    """
+
+    def __init__(self, cache_dir, max_size, plugin_version):
+        self.logger = logging.getLogger("mkdocs.plugins.pipeline_visualizer")
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._check_version(f"{plugin_version}:{CACHE_FORMAT}")
+
+    def _check_version(self, cache_version):
+        version_file = os.path.join(self.cache_dir, "VERSION")
+        try:
+            with open(version_file, "r") as f:
+                current = f.read().strip()
+        except OSError:
+            current = None
+
+        if current == cache_version:
+            return
+        if current is not None:
+            self.logger.info(
+                "Render cache version changed (%s -> %s), clearing %s",
+                current,
+                cache_version,
+                self.cache_dir,
+            )
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(version_file, "w") as f:
+            f.write(cache_version)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        # Refresh the mtime so eviction keeps recently used entries
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return record
+
+    def put(self, key, record):
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+            os.replace(tmp_path, path)
+        except BaseException as e:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            # Records that cannot be stored are rendered again by the next build
+            if not isinstance(e, (OSError, TypeError, ValueError)):
+                raise
+            self.logger.warning("Failed to write cache entry %s: %s", path, e)
+
+    def prune(self):
+        entries = []
+        total = 0
+        for root, _, filenames in os.walk(self.cache_dir):
+            for name in filenames:
+                if name == "VERSION":
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total <= self.max_size:
+            return 0
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self.logger.debug("Evicted %d entries from render cache", removed)
+        return removed
@@ -0,0 +1,162 @@
+from collections import deque
+
+
+class PipelineGraph:
+    """Execution graph of a pipeline: Start -> tasks -> finally tasks.
+
+    Nodes are task names, kept in insertion order. ``successors`` and
+    ``predecessors`` index the edges of every node.
+    """
+
+    START = "Start"
+
+    def __init__(self):
+        self.successors = {}
+        self.predecessors = {}
+        # (task, dependency) pairs whose runAfter names an unknown task
+        self.dangling = []
+
+    @classmethod
+    def from_tasks(cls, tasks, final_names):
+        """Build the graph of ``(name, runAfter)`` pairs and finally task names."""
+        graph = cls()
+        graph.add_node(cls.START)
+        names = [name for name, _ in tasks]
+        for name in names:
+            graph.add_node(name)
+
+        known = set(names)
+        for name, run_after in tasks:
+            if not run_after:
+                graph.add_edge(cls.START, name)
+            for dependency in run_after:
+                if dependency not in known:
+                    graph.dangling.append((name, dependency))
+                graph.add_edge(dependency, name)
+
+        if final_names:
+            end_tasks = [name for name in names if not graph.successors[name]]
+            for name in final_names:
+                graph.add_node(name)
+            for end_task in end_tasks:
+                graph.add_edge(end_task, final_names[0])
+            for current_task, next_task in zip(final_names, final_names[1:]):
+                graph.add_edge(current_task, next_task)
+        return graph
+
+    @property
+    def nodes(self):
+        return list(self.successors)
+
+    def add_node(self, node):
+        if node not in self.successors:
+            self.successors[node] = []
+            self.predecessors[node] = []
+
+    def add_edge(self, source, target):
+        self.add_node(source)
+        self.add_node(target)
+        if target not in self.successors[source]:
+            self.successors[source].append(target)
+            self.predecessors[target].append(source)
+
+    def edges(self):
+        return [
+            (source, target)
+            for source, targets in self.successors.items()
+            for target in targets
+        ]
+
+    def topological_order(self):
+        """Return the nodes in dependency order, or ``None`` if there is a cycle."""
+        indegree = {node: len(preds) for node, preds in self.predecessors.items()}
+        ready = deque(node for node, degree in indegree.items() if degree == 0)
+        order = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for child in self.successors[node]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        return order if len(order) == len(self.successors) else None
+
+    def find_cycles(self):
+        """Return one list of nodes for every strongly connected cycle."""
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        cycles = []
+        counter = 0
+
+        # Iterative Tarjan's algorithm, pipelines can be deep
+        for root in self.successors:
+            if root in index:
+                continue
+            work = [(root, iter(self.successors[root]))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.successors[child])))
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in self.successors[node]:
+                            cycles.append(component[::-1])
+        return cycles
+
+    def transitive_reduction(self):
+        """Return a copy without edges implied by longer paths.
+
+        Graphs with cycles are returned unchanged.
+        """
+        order = self.topological_order()
+        if order is None:
+            return self
+
+        position = {node: i for i, node in enumerate(order)}
+        # Descendants of every node as a bitset indexed by topological position
+        reach = {}
+        kept = {}
+        for node in reversed(order):
+            covered = 0
+            kept[node] = set()
+            for child in sorted(self.successors[node], key=position.__getitem__):
+                if covered >> position[child] & 1:
+                    continue
+                kept[node].add(child)
+                covered |= (1 << position[child]) | reach[child]
+            reach[node] = covered
+
+        reduced = PipelineGraph()
+        reduced.dangling = self.dangling
+        for node in self.successors:
+            reduced.add_node(node)
+        for source, targets in self.successors.items():
+            for target in targets:
+                if target in kept[source]:
+                    reduced.add_edge(source, target)
+        return reduced
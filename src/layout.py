@@ -0,0 +1,214 @@
+import hashlib
+from html import escape
+
+NODE_HEIGHT = 28
+CHAR_WIDTH = 7
+NODE_PADDING = 16
+DUMMY_WIDTH = 8
+NODE_GAP = 24
+LAYER_GAP = 48
+MARGIN = 8
+ORDERING_SWEEPS = 4
+
+
+class Layout:
+    """Node boxes and edge polylines of a layered drawing of a graph."""
+
+    def __init__(self, boxes, paths, width, height):
+        # node -> (x, y, width, height), x/y is the top left corner
+        self.boxes = boxes
+        # (source, target) -> list of (x, y) points
+        self.paths = paths
+        self.width = width
+        self.height = height
+
+
+def _assign_layers(nodes, successors):
+    """Longest path layering, edges closing a cycle are left out."""
+    # Find back edges with an iterative depth first search
+    state = dict.fromkeys(nodes, 0)
+    back_edges = set()
+    for root in nodes:
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [(root, iter(successors[root]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if state[child] == 0:
+                    state[child] = 1
+                    stack.append((child, iter(successors[child])))
+                    break
+                if state[child] == 1:
+                    back_edges.add((node, child))
+            else:
+                state[node] = 2
+                stack.pop()
+
+    indegree = dict.fromkeys(nodes, 0)
+    for node in nodes:
+        for child in successors[node]:
+            if (node, child) not in back_edges:
+                indegree[child] += 1
+    layer = dict.fromkeys(nodes, 0)
+    ready = [node for node in nodes if indegree[node] == 0]
+    while ready:
+        node = ready.pop()
+        for child in successors[node]:
+            if (node, child) in back_edges:
+                continue
+            layer[child] = max(layer[child], layer[node] + 1)
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    return layer, back_edges
+
+
+def _order_layers(layers, preds, succs):
+    """Reduce edge crossings with the barycenter heuristic."""
+    position = {node: i for layer in layers for i, node in enumerate(layer)}
+    for sweep in range(ORDERING_SWEEPS):
+        downward = sweep % 2 == 0
+        indexes = range(1, len(layers)) if downward else range(len(layers) - 2, -1, -1)
+        neighbours = preds if downward else succs
+        for index in indexes:
+            layer = layers[index]
+
+            def barycenter(node):
+                linked = neighbours[node]
+                if not linked:
+                    return position[node]
+                return sum(position[n] for n in linked) / len(linked)
+
+            layer.sort(key=barycenter)
+            for i, node in enumerate(layer):
+                position[node] = i
+    return layers
+
+
+def layered_layout(nodes, edges, direction="TB"):
+    """Lay out a directed graph in layers (Sugiyama style).
+
+    ``nodes`` is a list of node labels, ``edges`` a list of ``(source,
+    target)`` pairs. ``direction`` is ``TB`` (layers stacked top to bottom)
+    or ``LR`` (layers from left to right).
+    """
+    successors = {node: [] for node in nodes}
+    for source, target in edges:
+        successors[source].append(target)
+    layer, back_edges = _assign_layers(nodes, successors)
+
+    # Long edges get a dummy node on every layer they cross so they can be
+    # routed around the real nodes
+    preds = {node: [] for node in nodes}
+    succs = {node: [] for node in nodes}
+    chains = {}
+    for source, target in edges:
+        if (source, target) in back_edges:
+            chains[(source, target)] = [source, target]
+            continue
+        chain = [source]
+        for i in range(layer[source] + 1, layer[target]):
+            dummy = ("dummy", source, target, i)
+            layer[dummy] = i
+            preds[dummy], succs[dummy] = [], []
+            chain.append(dummy)
+        chain.append(target)
+        for a, b in zip(chain, chain[1:]):
+            succs[a].append(b)
+            preds[b].append(a)
+        chains[(source, target)] = chain
+
+    layers = [[] for _ in range(max(layer.values(), default=-1) + 1)]
+    for node in layer:
+        layers[layer[node]].append(node)
+    _order_layers(layers, preds, succs)
+
+    def size(node):
+        if isinstance(node, tuple):
+            return DUMMY_WIDTH, NODE_HEIGHT
+        return len(node) * CHAR_WIDTH + 2 * NODE_PADDING, NODE_HEIGHT
+
+    horizontal = direction == "LR"
+    # Extent of every node along the axis of its layer and across layers
+    extents = {}
+    for node in layer:
+        width, height = size(node)
+        extents[node] = (height, width) if horizontal else (width, height)
+
+    layer_lengths = [
+        sum(extents[node][0] for node in nodes_in_layer)
+        + NODE_GAP * max(len(nodes_in_layer) - 1, 0)
+        for nodes_in_layer in layers
+    ]
+    longest = max(layer_lengths, default=0)
+
+    centers = {}
+    depth = MARGIN
+    for nodes_in_layer, length in zip(layers, layer_lengths):
+        thickness = max((extents[node][1] for node in nodes_in_layer), default=0)
+        offset = MARGIN + (longest - length) / 2
+        for node in nodes_in_layer:
+            along, across = extents[node]
+            center = (offset + along / 2, depth + thickness / 2)
+            centers[node] = (center[1], center[0]) if horizontal else center
+            offset += along + NODE_GAP
+        depth += thickness + LAYER_GAP
+
+    boxes = {}
+    for node in nodes:
+        width, height = size(node)
+        x, y = centers[node]
+        boxes[node] = (x - width / 2, y - height / 2, width, height)
+
+    def port(node, outgoing):
+        x, y, width, height = boxes[node]
+        if horizontal:
+            return (x + width if outgoing else x, y + height / 2)
+        return (x + width / 2, y + height if outgoing else y)
+
+    paths = {}
+    for (source, target), chain in chains.items():
+        points = [port(source, True)]
+        points.extend(centers[dummy] for dummy in chain[1:-1])
+        points.append(port(target, False))
+        paths[(source, target)] = points
+
+    total_depth = max(depth - LAYER_GAP + MARGIN, 2 * MARGIN)
+    total_length = longest + 2 * MARGIN
+    if horizontal:
+        return Layout(boxes, paths, total_depth, total_length)
+    return Layout(boxes, paths, total_length, total_depth)
+
+
+def render_svg(nodes, edges, direction="TB"):
+    """Return an inline SVG drawing of the graph on a single line."""
+    layout = layered_layout(nodes, edges, direction)
+    marker = "pv-arrow-" + hashlib.sha1(repr(edges).encode("utf-8")).hexdigest()[:8]
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" class="pipeline-graph"'
+        f' width="{layout.width:.0f}" height="{layout.height:.0f}"'
+        f' viewBox="0 0 {layout.width:.0f} {layout.height:.0f}"'
+        f' font-family="sans-serif" font-size="12">',
+        f'<defs><marker id="{marker}" viewBox="0 0 10 10" refX="10" refY="5"'
+        ' markerWidth="8" markerHeight="8" orient="auto-start-reverse">'
+        '<path d="M 0 0 L 10 5 L 0 10 z" fill="currentColor"/></marker></defs>',
+    ]
+    for points in layout.paths.values():
+        coordinates = " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+        parts.append(
+            f'<polyline points="{coordinates}" fill="none" stroke="currentColor"'
+            f' marker-end="url(#{marker})"/>'
+        )
+    for node in nodes:
+        x, y, width, height = layout.boxes[node]
+        parts.append(
+            f'<g><rect x="{x:.1f}" y="{y:.1f}" width="{width:.1f}" height="{height:.1f}"'
+            ' rx="6" fill="none" stroke="currentColor"/>'
+            f'<text x="{x + width / 2:.1f}" y="{y + height / 2:.1f}" fill="currentColor"'
+            ' text-anchor="middle" dominant-baseline="central">'
+            f"{escape(node)}</text></g>"
+        )
+    parts.append("</svg>")
+    return "".join(parts)
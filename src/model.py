@@ -0,0 +1,290 @@
+VERSION_LABEL = "app.kubernetes.io/version"
+
+# taskRef kinds that refer to task pages
+TASK_REF_KINDS = ("task", "clustertask")
+
+
+def task_ref_target(task_ref):
+    """Return the ``(name, version)`` of the task a ``taskRef`` points to,
+    ``name`` is ``None`` when it does not refer to a task by name. The version
+    is a string, also when YAML parses it as a number."""
+    if str(task_ref.get("kind") or "Task").lower() not in TASK_REF_KINDS:
+        return None, ""
+    resolver_params = {
+        param.get("name"): param.get("value")
+        for param in task_ref.get("params", [])
+        if isinstance(param, dict)
+    }
+    name = task_ref.get("name") or resolver_params.get("name")
+    if not isinstance(name, str):
+        return None, ""
+    version = resolver_params.get("version")
+    return name, str(version) if version is not None else ""
+
+
+def task_ref_resolver(task_ref):
+    """Return ``[resolver, params]`` of a ``taskRef`` to a task fetched by a
+    resolver, ``params`` holds the ``[name, value]`` of its parameters sorted
+    by name. Returns ``None`` for other references."""
+    resolver = task_ref.get("resolver")
+    if not isinstance(resolver, str):
+        return None
+    if str(task_ref.get("kind") or "Task").lower() not in TASK_REF_KINDS:
+        return None
+    params = [
+        [param["name"], param.get("value")]
+        for param in task_ref.get("params", [])
+        if isinstance(param, dict) and isinstance(param.get("name"), str)
+    ]
+    return [resolver, sorted(params, key=lambda param: param[0])]
+
+
+def image_reference(image):
+    """Split a container image into its ``(repository, tag)``.
+
+    The tag is the digest for images pinned by digest and ``latest`` when
+    there is neither. Images set from parameters are kept whole.
+    """
+    if "$(" in image:
+        return image, ""
+    repository, _, digest = image.partition("@")
+    name_start = repository.rfind("/") + 1
+    colon = repository.find(":", name_start)
+    tag = ""
+    if colon != -1:
+        repository, tag = repository[:colon], repository[colon + 1 :]
+    if digest:
+        tag = f"{tag}@{digest}" if tag else digest
+    return repository, tag or "latest"
+
+
+def _when(spec):
+    return [
+        (
+            condition.get("input", ""),
+            condition.get("operator", ""),
+            condition.get("values", []),
+        )
+        for condition in spec.get("when", [])
+    ]
+
+
+class Param:
+    """A parameter declaration or a parameter value passed to a task."""
+
+    __slots__ = ("name", "type", "description", "default", "has_default", "value")
+
+    def __init__(self, param):
+        self.name = param.get("name", "Unnamed Parameter")
+        self.type = param.get("type", "String")
+        self.description = param.get("description", "No description provided.")
+        self.default = param.get("default", "")
+        self.has_default = "default" in param
+        self.value = param.get("value", "")
+
+
+class Workspace:
+    """A workspace declaration or a workspace binding of a pipeline task."""
+
+    __slots__ = ("name", "description", "optional", "workspace")
+
+    def __init__(self, workspace):
+        self.name = workspace.get("name", "Unnamed Workspace")
+        self.description = workspace.get("description", "")
+        self.optional = workspace.get("optional", False)
+        self.workspace = workspace.get("workspace", "Not specified")
+
+
+class Result:
+    __slots__ = ("name", "description")
+
+    def __init__(self, result):
+        self.name = result.get("name", "Unnamed Result")
+        self.description = result.get("description", "No description provided.")
+
+
+class EnvVar:
+    """An environment variable, ``source`` names the kind of ``valueFrom``."""
+
+    __slots__ = ("name", "value", "source", "ref_name", "key", "optional")
+
+    def __init__(self, var):
+        self.name = var.get("name", "Unnamed Variable")
+        self.value = var.get("value", "")
+        self.source = self.ref_name = self.key = None
+        self.optional = False
+        value_from = var.get("valueFrom", {})
+        for source in ("configMapKeyRef", "fieldRef", "secretKeyRef"):
+            if source in value_from:
+                ref = value_from[source]
+                self.source = source
+                if source == "fieldRef":
+                    self.key = ref.get("fieldPath", "Not specified")
+                else:
+                    self.ref_name = ref.get("name", "Not specified")
+                    self.key = ref.get("key", "Not specified")
+                    self.optional = ref.get("optional", False)
+                break
+
+
+class Step:
+    """A step of a task, also used for its ``stepTemplate``."""
+
+    __slots__ = (
+        "name",
+        "image",
+        "script",
+        "command",
+        "args",
+        "env",
+        "env_from",
+        "timeout",
+        "when",
+        "retries",
+    )
+
+    def __init__(self, step, index=0):
+        self.name = step.get("name", f"Step {index}")
+        self.image = step.get("image", "Not specified")
+        self.script = step.get("script", "")
+        self.command = step.get("command", [])
+        self.args = step.get("args", [])
+        self.env = [EnvVar(var) for var in step.get("env", [])]
+        # (type, name) of config maps and secrets the environment comes from,
+        # None without envFrom
+        env_from = step.get("envFrom", [])
+        self.env_from = [] if env_from else None
+        for value_from in env_from:
+            if value_from.get("configMapRef", {}):
+                name = value_from["configMapRef"].get("name", "Not specified")
+                self.env_from.append(("ConfigMap", name))
+            if value_from.get("secretRef", {}):
+                name = value_from["secretRef"].get("name", "Not specified")
+                self.env_from.append(("Secret", name))
+        self.timeout = step.get("timeout")
+        self.when = _when(step)
+        self.retries = step.get("retries")
+
+
+class PipelineTask:
+    """A task of a pipeline, ``name`` is ``None`` when it has none.
+
+    Names, also in ``run_after``, are strings when YAML parses them as numbers.
+
+    ``resolver`` is the ``[resolver, params]`` of tasks fetched by a resolver,
+    see ``task_ref_resolver``.
+    """
+
+    __slots__ = (
+        "name",
+        "ref_label",
+        "ref_name",
+        "ref_version",
+        "resolver",
+        "run_after",
+        "params",
+        "workspaces",
+        "env",
+        "timeout",
+        "when",
+        "retries",
+    )
+
+    def __init__(self, task):
+        name = task.get("name")
+        self.name = str(name) if name is not None else None
+        task_ref = task.get("taskRef", {})
+        # Shown when the reference cannot be linked to a task page
+        self.ref_label = task_ref.get("name", "Not specified")
+        self.ref_name, self.ref_version = task_ref_target(task_ref)
+        self.resolver = task_ref_resolver(task_ref)
+        self.run_after = [str(dependency) for dependency in task.get("runAfter", [])]
+        self.params = [Param(param) for param in task.get("params", [])]
+        self.workspaces = [Workspace(ws) for ws in task.get("workspaces", [])]
+        self.env = [EnvVar(var) for var in task.get("env", [])]
+        self.timeout = task.get("timeout")
+        self.when = _when(task)
+        self.retries = task.get("retries")
+
+
+class Resource:
+    """A document of a manifest, only its title is rendered.
+
+    ``name`` is ``None`` when the resource has none. Names and versions are
+    strings, also when YAML parses them as numbers or dates.
+    """
+
+    __slots__ = ("kind", "name", "version")
+
+    def __init__(self, document):
+        metadata = document.get("metadata", {})
+        self.kind = document.get("kind", "")
+        name = metadata.get("name")
+        self.name = str(name) if name is not None else None
+        resource_version = metadata.get("labels", {}).get(VERSION_LABEL)
+        self.version = str(resource_version) if resource_version is not None else ""
+
+
+class Task(Resource):
+    """A task, ``step_images`` holds ``[image, steps]`` of the images its
+    steps run, steps without an image use the one of the step template."""
+
+    __slots__ = (
+        "display_name",
+        "description",
+        "params",
+        "results",
+        "workspaces",
+        "step_template",
+        "steps",
+    )
+
+    def __init__(self, document):
+        super().__init__(document)
+        metadata = document.get("metadata", {})
+        spec = document.get("spec", {})
+        self.display_name = metadata.get("annotations", {}).get(
+            "tekton.dev/displayName"
+        )
+        self.description = spec.get("description", "No description")
+        self.params = [Param(param) for param in spec.get("params", [])]
+        self.results = [Result(result) for result in spec.get("results", [])]
+        self.workspaces = [Workspace(ws) for ws in spec.get("workspaces", [])]
+        template = spec.get("stepTemplate")
+        self.step_template = Step(template) if template else None
+        self.steps = [
+            Step(step, index) for index, step in enumerate(spec.get("steps", []), 1)
+        ]
+
+    @property
+    def step_images(self):
+        template = self.step_template
+        default = template.image if template is not None else "Not specified"
+        counts = {}
+        for step in self.steps:
+            image = step.image if step.image != "Not specified" else default
+            if image != "Not specified":
+                image = str(image)
+                counts[image] = counts.get(image, 0) + 1
+        return [[image, steps] for image, steps in counts.items()]
+
+
+class Pipeline(Resource):
+    __slots__ = ("params", "workspaces", "tasks", "final")
+
+    def __init__(self, document):
+        super().__init__(document)
+        spec = document.get("spec", {})
+        self.params = [Param(param) for param in spec.get("params", [])]
+        self.workspaces = [Workspace(ws) for ws in spec.get("workspaces", [])]
+        self.tasks = [PipelineTask(task) for task in spec.get("tasks", [])]
+        self.final = [PipelineTask(task) for task in spec.get("finally", [])]
+
+
+_RESOURCE_TYPES = {"pipeline": Pipeline, "task": Task}
+
+
+def load_resource(document):
+    """Build the model of a parsed YAML document."""
+    kind = document.get("kind", "")
+    return _RESOURCE_TYPES.get(str(kind).lower(), Resource)(document)
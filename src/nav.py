@@ -0,0 +1,102 @@
+class NavSection:
+    """A level of the navigation tree with an index of its children.
+
+    Children are looked up by title in O(1) instead of scanning the mkdocs
+    list-of-dicts structure, which is only produced once by ``to_nav``.
+    """
+
+    __slots__ = ("items", "index")
+
+    def __init__(self):
+        # Ordered [title, value] pairs, value is a NavSection, a list of
+        # version entries or a page path. Foreign items are kept as [None, item].
+        self.items = []
+        self.index = {}
+
+    @classmethod
+    def from_nav(cls, nav_list):
+        """Build a section from an existing mkdocs nav list."""
+        section = cls()
+        for item in nav_list:
+            if isinstance(item, dict) and len(item) == 1:
+                title, value = next(iter(item.items()))
+                if isinstance(value, list):
+                    value = cls.from_nav(value)
+                section._append(title, value)
+            else:
+                section.items.append([None, item])
+        return section
+
+    def _append(self, title, value):
+        entry = [title, value]
+        self.items.append(entry)
+        self.index.setdefault(title, entry)
+        return entry
+
+    def section(self, title):
+        """Return the child section called ``title``, creating it if needed."""
+        entry = self.index.get(title)
+        if entry is None or not isinstance(entry[1], NavSection):
+            entry = [title, NavSection()]
+            self.items.append(entry)
+            self.index[title] = entry
+        return entry[1]
+
+    def find(self, path_parts):
+        section = self
+        for part in path_parts:
+            section = section.section(part)
+        return section
+
+    def add_page(self, title, path):
+        self._append(title, path)
+
+    def add_versions(self, title, versions):
+        """Add ``[{title: path}, ...]`` entries under ``title``."""
+        entry = self.index.get(title)
+        if entry is not None and isinstance(entry[1], NavSection):
+            for version_title, path in versions:
+                entry[1].add_page(version_title, path)
+        elif entry is not None and isinstance(entry[1], list):
+            entry[1].extend({version_title: path} for version_title, path in versions)
+        else:
+            self._append(
+                title, [{version_title: path} for version_title, path in versions]
+            )
+
+    def to_nav(self):
+        nav = []
+        for title, value in self.items:
+            if title is None:
+                nav.append(value)
+            elif isinstance(value, NavSection):
+                nav.append({title: value.to_nav()})
+            else:
+                nav.append({title: value})
+        return nav
+
+
+def find_sections(nav, section_names):
+    """Find the first empty section named after each of ``section_names``.
+
+    The nav is walked once for all names. Returns a dict of name to the
+    (empty) list of the section, names that were not found are left out.
+    """
+    wanted = set(section_names)
+    found = {}
+    stack = [nav]
+    while stack and wanted:
+        nav_item = stack.pop()
+        if isinstance(nav_item, list):
+            stack.extend(reversed(nav_item))
+        elif isinstance(nav_item, dict):
+            # Visit the keys of a dict in order, each followed by its value
+            stack.extend(reversed(list(nav_item.items())))
+        elif isinstance(nav_item, tuple):
+            key, value = nav_item
+            if key in wanted and isinstance(value, list) and not value:
+                found[key] = value
+                wanted.discard(key)
+            else:
+                stack.append(value)
+    return found
@@ -0,0 +1,61 @@
+import re
+
+
+def glob_to_regex(pattern):
+    """Translate a glob into a regular expression matching ``/`` separated paths.
+
+    ``*`` and ``?`` do not match ``/``, ``**`` matches any number of
+    directories and ``[...]`` matches a character class. Patterns without a
+    ``/`` match the file or directory name at any depth, like in
+    ``.gitignore``. A pattern also matches everything below the directories
+    it matches.
+    """
+    pattern = pattern.strip("/")
+    anchored = "/" in pattern
+    i, n = 0, len(pattern)
+    parts = [] if anchored else ["(?:.*/)?"]
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            parts.append("[^/]*")
+        elif c == "?":
+            parts.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end < 0:
+                parts.append(re.escape(c))
+            else:
+                chars = pattern[i + 1 : end]
+                if chars[0] == "!":
+                    chars = "^" + chars[1:]
+                parts.append("[" + chars.replace("\\", "\\\\") + "]")
+                i = end
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    parts.append("(?:/.*)?")
+    return "".join(parts)
+
+
+def compile_path_filter(include=(), exclude=()):
+    """Compile include and exclude globs into a single matcher.
+
+    Returns a function that tells if a ``/`` separated path is included:
+    it matches one of ``include`` (any path when there are none) and none of
+    ``exclude``.
+    """
+    included = "|".join(glob_to_regex(p) for p in include) or ".*"
+    excluded = "|".join(glob_to_regex(p) for p in exclude)
+    if excluded:
+        matcher = re.compile(f"(?!(?:{excluded})$)(?:{included})", re.DOTALL)
+    else:
+        matcher = re.compile(f"(?:{included})", re.DOTALL)
+    return lambda path: matcher.fullmatch(path) is not None
@@ -0,0 +1,96 @@
+import os
+import shlex
+import hashlib
+import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# Written by PlantUML after each diagram read from stdin
+PIPE_DELIMITER = "@@pipeline-visualizer-diagram-end@@"
+
+
+def diagram_key(source):
+    """Return the cache key of a diagram, its source includes the theme."""
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class PlantUMLRenderer:
+    """Renders PlantUML diagrams to SVG with a local PlantUML executable.
+
+    Diagrams are rendered in batches, one PlantUML process per batch, with at
+    most ``workers`` processes running at once. Rendered SVGs are cached in
+    ``cache_dir`` by the hash of their source.
+    """
+
+    def __init__(self, command, workers, cache_dir):
+        self.logger = logging.getLogger("mkdocs.plugins.pipeline_visualizer")
+        self.command = shlex.split(command)
+        self.workers = max(1, workers)
+        self.cache_dir = cache_dir
+        self.rendered = 0
+        self.cached = 0
+
+    def _cache_path(self, source):
+        return os.path.join(self.cache_dir, f"{diagram_key(source)}.svg")
+
+    def render(self, sources):
+        """Return a dict of source to SVG, diagrams that failed are left out."""
+        svgs = {}
+        missing = []
+        for source in dict.fromkeys(sources):
+            path = self._cache_path(source)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    svgs[source] = f.read()
+                os.utime(path)
+                self.cached += 1
+            except OSError:
+                missing.append(source)
+
+        if not missing:
+            return svgs
+
+        batch_count = min(self.workers, len(missing))
+        batches = [missing[i::batch_count] for i in range(batch_count)]
+        self.logger.info(
+            "Rendering %d diagrams with %d PlantUML processes",
+            len(missing),
+            batch_count,
+        )
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=batch_count) as executor:
+            for batch, results in zip(batches, executor.map(self._run, batches)):
+                for source, svg in zip(batch, results):
+                    if svg is None:
+                        continue
+                    with open(self._cache_path(source), "w", encoding="utf-8") as f:
+                        f.write(svg)
+                    svgs[source] = svg
+                    self.rendered += 1
+        return svgs
+
+    def _run(self, batch):
+        try:
+            result = subprocess.run(
+                self.command + ["-tsvg", "-pipe", "-pipedelimitor", PIPE_DELIMITER],
+                input="\n".join(batch).encode("utf-8"),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=False,
+            )
+        except OSError as e:
+            self.logger.error("Failed to run PlantUML %s: %s", self.command, e)
+            return [None] * len(batch)
+
+        outputs = result.stdout.decode("utf-8", "replace").split(PIPE_DELIMITER)
+        if result.returncode != 0 or len(outputs) < len(batch):
+            self.logger.warning(
+                "PlantUML exited with %d: %s",
+                result.returncode,
+                result.stderr.decode("utf-8", "replace").strip(),
+            )
+        svgs = []
+        for output in outputs[: len(batch)]:
+            start = output.find("<svg")
+            svgs.append(output[start:].strip() if start != -1 else None)
+        return svgs + [None] * (len(batch) - len(svgs))
@@ -0,0 +1,153 @@
+import os
+import re
+import json
+import logging
+import yaml
+from .model import image_reference
+
+# Characters of resolver parameters that are not used in cache paths
+_PATH_PART = re.compile(r"[^\w.@+-]+")
+# Scheme and user of a git URL, e.g. https:// or git@
+_GIT_URL_PREFIX = re.compile(r"^(?:[\w+.-]+://)?(?:[^@/]+@)?")
+
+
+def resolver_key(resolver, params):
+    """Return the key of a resolver reference, equal for equal parameters."""
+    return json.dumps([resolver, params], sort_keys=True)
+
+
+def _path_part(value):
+    return _PATH_PART.sub("_", str(value))
+
+
+def _path_parts(value):
+    """Split ``value`` into path parts, dropping parts that leave the directory."""
+    return [
+        _path_part(part)
+        for part in str(value).split("/")
+        if part not in ("", ".", "..")
+    ]
+
+
+def bundle_path(params):
+    """``bundles/<repository>/<tag>.yaml``, all resources of an OCI bundle."""
+    bundle = params.get("bundle")
+    if not bundle:
+        return None
+    repository, tag = image_reference(str(bundle))
+    return ["bundles", *_path_parts(repository), f"{_path_part(tag)}.yaml"]
+
+
+def git_path(params):
+    """``git/<host>/<repository>/<revision>/<pathInRepo>``, a checkout of a
+    repository. Repositories given by ``org`` and ``repo`` are stored below
+    ``git/<org>/<repo>``."""
+    path_in_repo = params.get("pathInRepo")
+    if not path_in_repo:
+        return None
+    if params.get("url"):
+        url = _GIT_URL_PREFIX.sub("", str(params["url"]))
+        if url.endswith(".git"):
+            url = url[: -len(".git")]
+        repository = url.replace(":", "/")
+    elif params.get("org") and params.get("repo"):
+        repository = f"{params['org']}/{params['repo']}"
+    else:
+        return None
+    revision = params.get("revision") or "main"
+    return [
+        "git",
+        *_path_parts(repository),
+        _path_part(revision),
+        *_path_parts(path_in_repo),
+    ]
+
+
+def hub_path(params):
+    """``hub/<catalog>/<kind>/<name>/<version>/<name>.yaml``, the layout of
+    the Tekton catalog."""
+    name, version = params.get("name"), params.get("version")
+    if not name or not version:
+        return None
+    return [
+        "hub",
+        _path_part(params.get("catalog") or "tekton"),
+        _path_part(str(params.get("kind") or "task").lower()),
+        _path_part(name),
+        _path_part(version),
+        f"{_path_part(name)}.yaml",
+    ]
+
+
+# Resolvers and the path of their content below the resolver cache
+RESOLVER_PATHS = {"bundles": bundle_path, "git": git_path, "hub": hub_path}
+
+
+class ResolverCache:
+    """Tasks fetched by resolvers, read from a local directory.
+
+    Every resolver in ``paths`` maps the parameters of a reference to a file
+    below ``directory``, e.g. a pre-fetched bundle or git export. A file may
+    hold several documents, the task matching the ``kind`` and ``name``
+    parameters is used. References are resolved once, the tasks are
+    memoized by resolver and parameters for the lifetime of the instance.
+    """
+
+    def __init__(self, directory, loader=yaml.SafeLoader, paths=None):
+        self.logger = logging.getLogger("mkdocs.plugins.pipeline_visualizer")
+        self.directory = directory
+        self.loader = loader
+        self.paths = RESOLVER_PATHS if paths is None else paths
+        self.files_loaded = 0
+        self._resolved = {}
+
+    def resolve(self, resolver, params):
+        """Return the task document a reference resolves to, or ``None``."""
+        key = resolver_key(resolver, params)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+        document = self._resolved[key] = self._load(resolver, dict(params))
+        return document
+
+    def path(self, resolver, params):
+        """Return the path of the content of a reference, or ``None`` when it
+        cannot be told without fetching it."""
+        make_path = self.paths.get(resolver)
+        if make_path is None:
+            return None
+        # Parameters of the pipeline are only known when it runs
+        if any("$(" in str(value) for value in params.values()):
+            return None
+        parts = make_path(params)
+        return None if parts is None else os.path.join(self.directory, *parts)
+
+    def _load(self, resolver, params):
+        path = self.path(resolver, params)
+        if path is None:
+            self.logger.debug("Cannot resolve %s reference %s", resolver, params)
+            return None
+        kind = str(params.get("kind") or "task").lower()
+        name = params.get("name")
+        try:
+            with open(path, "r") as f:
+                self.files_loaded += 1
+                for document in yaml.load_all(f, Loader=self.loader):
+                    if (
+                        isinstance(document, dict)
+                        and str(document.get("kind", "")).lower() == kind
+                        and (
+                            name is None
+                            or (document.get("metadata") or {}).get("name") == name
+                        )
+                    ):
+                        return document
+        except OSError as e:
+            self.logger.debug("Resolver cache miss for %s: %s", resolver, e)
+            return None
+        except yaml.YAMLError as e:
+            self.logger.error("Error parsing resolved task %s: %s", path, e)
+            return None
+        self.logger.warning("No %s %s in resolved file %s", kind, name or "", path)
+        return None
@@ -0,0 +1,119 @@
+import time
+import heapq
+from contextlib import contextmanager, nullcontext
+
+# Number of files listed in the slowest files of a build
+SLOWEST_FILES = 10
+
+
+class BuildStats:
+    """Timers and counters of a single build.
+
+    Phases can be entered several times, their time and number of calls add
+    up. Times of phases that ran in worker processes are summed over all
+    workers, so they can exceed the wall time of the build.
+    """
+
+    enabled = True
+
+    def __init__(self, slowest=SLOWEST_FILES):
+        self.phases = {}
+        self.counters = {}
+        self.slowest = slowest
+        # Min-heap of (seconds, path) holding the slowest files
+        self._files = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds, calls=1):
+        phase = self.phases.setdefault(name, [0.0, 0])
+        phase[0] += seconds
+        phase[1] += calls
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def file_time(self, path, seconds):
+        if len(self._files) < self.slowest:
+            heapq.heappush(self._files, (seconds, path))
+        elif seconds > self._files[0][0]:
+            heapq.heapreplace(self._files, (seconds, path))
+
+    def merge(self, other):
+        """Add the timers and counters of ``other``, e.g. from a worker."""
+        for name, (seconds, calls) in other.phases.items():
+            self.add_time(name, seconds, calls)
+        for name, n in other.counters.items():
+            self.count(name, n)
+        for seconds, path in other._files:
+            self.file_time(path, seconds)
+
+    def slowest_files(self):
+        return [(path, seconds) for seconds, path in sorted(self._files, reverse=True)]
+
+    def to_dict(self):
+        return {
+            "phases": {
+                name: {"seconds": round(seconds, 6), "calls": calls}
+                for name, (seconds, calls) in self.phases.items()
+            },
+            "counters": dict(self.counters),
+            "slowest_files": [
+                {"path": path, "seconds": round(seconds, 6)}
+                for path, seconds in self.slowest_files()
+            ],
+        }
+
+    def summary(self):
+        """Return the lines of a human readable summary."""
+        lines = [
+            "Timing: "
+            + ", ".join(
+                f"{name} {seconds:.3f}s" + (f" ({calls} calls)" if calls > 1 else "")
+                for name, (seconds, calls) in self.phases.items()
+            )
+        ]
+        if self.counters:
+            lines.append(
+                "Counters: "
+                + ", ".join(f"{name} {n}" for name, n in sorted(self.counters.items()))
+            )
+        if self._files:
+            lines.append(
+                "Slowest files: "
+                + ", ".join(
+                    f"{path} {seconds:.3f}s" for path, seconds in self.slowest_files()
+                )
+            )
+        return lines
+
+
+class NullStats:
+    """Stand-in for ``BuildStats`` when timing is off, every call is a no-op."""
+
+    enabled = False
+    _context = nullcontext()
+
+    def phase(self, name):
+        return self._context
+
+    def add_time(self, name, seconds, calls=1):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def file_time(self, path, seconds):
+        pass
+
+    def merge(self, other):
+        pass
+
+
+NULL_STATS = NullStats()
@@ -0,0 +1,79 @@
+import os
+import hashlib
+import jinja2
+
+# Directory of the templates shipped with the plugin
+DEFAULT_TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+# Languages of code blocks for the interpreters of script shebangs
+SHEBANG_LANGUAGES = {
+    "python": "python",
+    "ruby": "ruby",
+    "perl": "perl",
+    "node": "javascript",
+    "php": "php",
+    "bash": "bash",
+    "pwsh": "powershell",
+    "lua": "lua",
+}
+
+
+def markdown_value(value):
+    """Format a value for a table cell, lists become HTML lists."""
+    if isinstance(value, list):
+        value = "<ul>" + "".join(f"<li>`{v}`</li>" for v in value) + "</ul>"
+    elif isinstance(value, str) and "\n" in value:
+        value = value.replace("\n", "<br>")
+    return value
+
+
+def script_type(script):
+    """Return the language of a script from its shebang, ``shell`` by default."""
+    lines = script.splitlines()
+    if lines and lines[0].startswith("#!"):
+        first_line = lines[0]
+        for key in SHEBANG_LANGUAGES:
+            if key in first_line:
+                return SHEBANG_LANGUAGES[key]
+
+    return "shell"
+
+
+class PageTemplates:
+    """Jinja2 templates of the pipeline, task, search and image pages.
+
+    Templates in ``directory`` override the default templates of the same
+    name. The templates are compiled once when they are loaded and reused for
+    every resource. ``digest`` identifies the sources of all templates, so
+    rendered pages can be invalidated when a template changes. Loading fails
+    with ``jinja2.TemplateError`` when a template is invalid.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        search_path = [DEFAULT_TEMPLATES_DIR]
+        if directory is not None:
+            search_path.insert(0, directory)
+        self.environment = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(search_path),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+            # Templates do not change during a build
+            auto_reload=False,
+        )
+        self.environment.filters["markdown_value"] = markdown_value
+        self.environment.filters["script_type"] = script_type
+        self.digest = self._digest()
+        self.pipeline = self.environment.get_template("pipeline.md.j2")
+        self.task = self.environment.get_template("task.md.j2")
+        self.search = self.environment.get_template("search.md.j2")
+        self.images = self.environment.get_template("images.md.j2")
+
+    def _digest(self):
+        digest = hashlib.sha256()
+        loader = self.environment.loader
+        for name in sorted(self.environment.list_templates(extensions=["j2"])):
+            source, _, _ = loader.get_source(self.environment, name)
+            digest.update(f"{name}\0{source}\0".encode("utf-8"))
+        return digest.hexdigest()
@@ -0,0 +1,52 @@
+import os
+from .cache import RenderCache, render_key
+
+
+def test_cache_round_trip(tmp_path):
+    cache = RenderCache(str(tmp_path), 1024 * 1024, "1.0")
+    key = render_key(b"kind: Task", "settings")
+
+    assert cache.get(key) is None
+    cache.put(key, {"kind": "task", "content": "# Task"})
+    assert cache.get(key) == {"kind": "task", "content": "# Task"}
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_put_skips_records_that_are_not_json(tmp_path):
+    cache = RenderCache(str(tmp_path), 1024 * 1024, "1.0")
+    key = render_key(b"kind: Task", "settings")
+
+    cache.put(key, {"kind": "task", "version": object()})
+
+    assert cache.get(key) is None
+    assert not [
+        name for _, _, names in os.walk(tmp_path) for name in names if ".tmp" in name
+    ]
+
+
+def test_cache_key_depends_on_settings():
+    assert render_key(b"kind: Task", "TB") != render_key(b"kind: Task", "LR")
+
+
+def test_cache_invalidated_on_version_change(tmp_path):
+    cache = RenderCache(str(tmp_path), 1024 * 1024, "1.0")
+    key = render_key(b"kind: Task", "settings")
+    cache.put(key, {"kind": "task"})
+
+    cache = RenderCache(str(tmp_path), 1024 * 1024, "1.1")
+    assert cache.get(key) is None
+
+
+def test_cache_prune_evicts_oldest(tmp_path):
+    cache = RenderCache(str(tmp_path), 1024 * 1024, "1.0")
+    keys = [render_key(str(i).encode(), "settings") for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, {"content": "x" * 1000})
+        path = cache._entry_path(key)
+        os.utime(path, (i, i))
+
+    cache.max_size = 2500
+    assert cache.prune() == 1
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) is not None
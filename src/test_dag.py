@@ -0,0 +1,62 @@
+from .dag import PipelineGraph
+
+
+def test_graph_from_tasks():
+    graph = PipelineGraph.from_tasks(
+        [("a", []), ("b", ["a"]), ("c", [])],
+        ["f1", "f2"],
+    )
+
+    assert graph.nodes == ["Start", "a", "b", "c", "f1", "f2"]
+    assert graph.edges() == [
+        ("Start", "a"),
+        ("Start", "c"),
+        ("a", "b"),
+        ("b", "f1"),
+        ("c", "f1"),
+        ("f1", "f2"),
+    ]
+    assert graph.predecessors["f1"] == ["b", "c"]
+    assert graph.dangling == []
+
+
+def test_dangling_run_after():
+    graph = PipelineGraph.from_tasks([("a", ["ghost"])], [])
+
+    assert graph.dangling == [("a", "ghost")]
+
+
+def test_topological_order():
+    graph = PipelineGraph.from_tasks([("c", ["b"]), ("b", ["a"]), ("a", [])], [])
+
+    assert graph.topological_order() == ["Start", "a", "b", "c"]
+
+
+def test_cycle_detection():
+    graph = PipelineGraph.from_tasks(
+        [("a", []), ("b", ["a", "c"]), ("c", ["b"]), ("d", ["d"])], []
+    )
+
+    assert graph.topological_order() is None
+    assert sorted(sorted(cycle) for cycle in graph.find_cycles()) == [
+        ["b", "c"],
+        ["d"],
+    ]
+    assert graph.transitive_reduction() is graph
+
+
+def test_transitive_reduction():
+    tasks = [(f"t{i}", [f"t{j}" for j in range(i)]) for i in range(6)]
+    graph = PipelineGraph.from_tasks(tasks, [])
+
+    reduced = graph.transitive_reduction()
+
+    assert len(graph.edges()) == 16
+    assert reduced.edges() == [
+        ("Start", "t0"),
+        ("t0", "t1"),
+        ("t1", "t2"),
+        ("t2", "t3"),
+        ("t3", "t4"),
+        ("t4", "t5"),
+    ]
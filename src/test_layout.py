@@ -0,0 +1,54 @@
+import time
+from .layout import layered_layout, render_svg
+
+NODES = ["Start", "fetch", "lint", "test", "push"]
+EDGES = [
+    ("Start", "fetch"),
+    ("fetch", "lint"),
+    ("fetch", "test"),
+    ("lint", "push"),
+    ("test", "push"),
+    ("fetch", "push"),
+]
+
+
+def test_nodes_are_layered_top_to_bottom():
+    layout = layered_layout(NODES, EDGES, "TB")
+    y = {node: box[1] for node, box in layout.boxes.items()}
+
+    assert y["Start"] < y["fetch"] < y["lint"] == y["test"] < y["push"]
+    # The long edge is routed through a bend on the skipped layer
+    assert len(layout.paths[("fetch", "push")]) == 3
+
+
+def test_left_to_right_direction():
+    layout = layered_layout(NODES, EDGES, "LR")
+    x = {node: box[0] for node, box in layout.boxes.items()}
+
+    assert x["Start"] < x["fetch"] < x["lint"] == x["test"] < x["push"]
+    assert layout.width > layout.height
+
+
+def test_cycles_are_drawn():
+    layout = layered_layout(["a", "b"], [("a", "b"), ("b", "a")])
+
+    assert set(layout.paths) == {("a", "b"), ("b", "a")}
+
+
+def test_svg_escapes_labels():
+    svg = render_svg(["Start", "<task>"], [("Start", "<task>")])
+
+    assert svg.startswith("<svg") and svg.endswith("</svg>")
+    assert "&lt;task&gt;" in svg
+    assert "\n" not in svg
+
+
+def test_large_pipeline_layout_is_fast():
+    nodes = ["Start"] + [f"task-{i}" for i in range(300)]
+    edges = [("Start", "task-0")]
+    for i in range(1, 300):
+        edges.extend((f"task-{j}", f"task-{i}") for j in range(max(0, i - 3), i))
+
+    start = time.perf_counter()
+    render_svg(nodes, edges)
+    assert time.perf_counter() - start < 1
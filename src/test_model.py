@@ -0,0 +1,154 @@
+import pytest
+import yaml
+from .model import (
+    EnvVar,
+    Pipeline,
+    PipelineTask,
+    Resource,
+    Step,
+    Task,
+    image_reference,
+    load_resource,
+    task_ref_resolver,
+    task_ref_target,
+)
+
+
+def test_load_resource_dispatches_on_kind():
+    assert type(load_resource({"kind": "Pipeline"})) is Pipeline
+    assert type(load_resource({"kind": "task"})) is Task
+    resource = load_resource({"kind": "ConfigMap", "metadata": {"name": "cm"}})
+    assert type(resource) is Resource
+    assert (resource.kind, resource.name, resource.version) == ("ConfigMap", "cm", "")
+
+
+def test_model_uses_slots():
+    task = Task({"kind": "Task", "spec": {"steps": [{"image": "alpine"}]}})
+    assert not hasattr(task, "__dict__")
+    assert not hasattr(task.steps[0], "__dict__")
+
+
+def test_task_defaults():
+    task = Task(
+        {
+            "kind": "Task",
+            "metadata": {"name": "t", "labels": {"app.kubernetes.io/version": "1.0"}},
+            "spec": {
+                "params": [{"name": "a"}, {"name": "b", "default": ""}],
+                "steps": [{"image": "alpine"}, {"name": "named"}],
+            },
+        }
+    )
+    assert task.version == "1.0"
+    assert task.description == "No description"
+    assert task.step_template is None
+    assert [p.has_default for p in task.params] == [False, True]
+    assert task.params[0].description == "No description provided."
+    assert [s.name for s in task.steps] == ["Step 1", "named"]
+    assert task.steps[1].image == "Not specified"
+
+
+def test_names_and_versions_are_strings():
+    resource = load_resource(
+        yaml.safe_load(
+            "kind: Task\nmetadata:\n  name: 2024\n"
+            "  labels:\n    app.kubernetes.io/version: 2024-01-31\n"
+        )
+    )
+    assert (resource.name, resource.version) == ("2024", "2024-01-31")
+    assert load_resource({"kind": "Task", "metadata": {}}).version == ""
+
+
+def test_env_var_sources():
+    secret = EnvVar({"name": "s", "valueFrom": {"secretKeyRef": {"name": "n"}}})
+    assert (secret.source, secret.ref_name, secret.key) == (
+        "secretKeyRef",
+        "n",
+        "Not specified",
+    )
+    field = EnvVar({"name": "f", "valueFrom": {"fieldRef": {"fieldPath": "p"}}})
+    assert (field.source, field.key) == ("fieldRef", "p")
+    assert EnvVar({"name": "v", "value": "x"}).source is None
+
+
+def test_step_template_env_from():
+    template = Step(
+        {"envFrom": [{"configMapRef": {"name": "cm"}, "secretRef": {"name": "s"}}]}
+    )
+    assert template.env_from == [("ConfigMap", "cm"), ("Secret", "s")]
+    assert Step({}).env_from is None
+
+
+def test_pipeline_task_references():
+    task = PipelineTask({"name": "build", "taskRef": {"name": "git-clone"}})
+    assert (task.ref_name, task.ref_version, task.ref_label) == (
+        "git-clone",
+        "",
+        "git-clone",
+    )
+    assert PipelineTask({}).name is None
+    assert task_ref_target({"name": "x", "kind": "CustomRun"}) == (None, "")
+    assert task_ref_target(
+        {
+            "resolver": "hub",
+            "params": [
+                {"name": "name", "value": "git-clone"},
+                {"name": "version", "value": "0.9"},
+            ],
+        }
+    ) == ("git-clone", "0.9")
+    # Unquoted versions parse as numbers
+    task_ref = yaml.safe_load(
+        "resolver: hub\nparams:\n- {name: name, value: git-clone}\n"
+        "- {name: version, value: 0.9}\n"
+    )
+    assert task_ref_target(task_ref) == ("git-clone", "0.9")
+    task = PipelineTask(
+        {
+            "name": "lint",
+            "taskRef": {
+                "resolver": "git",
+                "params": [
+                    {"name": "url", "value": "https://github.com/org/repo.git"},
+                    {"name": "pathInRepo", "value": "tasks/lint.yaml"},
+                ],
+            },
+        }
+    )
+    assert task.ref_name is None
+    assert task.resolver == [
+        "git",
+        [["pathInRepo", "tasks/lint.yaml"], ["url", "https://github.com/org/repo.git"]],
+    ]
+    assert task_ref_resolver({"name": "build"}) is None
+    assert task_ref_resolver({"resolver": "hub", "kind": "CustomRun"}) is None
+
+
+@pytest.mark.parametrize(
+    "image, reference",
+    [
+        ("alpine", ("alpine", "latest")),
+        ("alpine:3.19", ("alpine", "3.19")),
+        ("registry:5000/tools/go:1.22", ("registry:5000/tools/go", "1.22")),
+        ("registry:5000/tools/go", ("registry:5000/tools/go", "latest")),
+        ("go@sha256:abc", ("go", "sha256:abc")),
+        ("go:1.22@sha256:abc", ("go", "1.22@sha256:abc")),
+        ("$(params.image)", ("$(params.image)", "")),
+    ],
+)
+def test_image_reference(image, reference):
+    assert image_reference(image) == reference
+
+
+def test_step_images_use_the_step_template():
+    task = Task(
+        {
+            "spec": {
+                "stepTemplate": {"image": "alpine"},
+                "steps": [{"image": "go"}, {}, {"image": "go"}, {}],
+            }
+        }
+    )
+
+    assert task.step_images == [["go", 2], ["alpine", 2]]
+    assert Task({"spec": {"steps": [{}]}}).step_images == []
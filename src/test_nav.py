@@ -0,0 +1,54 @@
+from .nav import NavSection, find_sections
+
+
+def test_round_trip_keeps_foreign_items():
+    nav = [
+        "index.md",
+        {"Home": "home.md"},
+        {"Guides": [{"Intro": "intro.md"}, "loose.md"]},
+        {"a": "a.md", "b": "b.md"},
+    ]
+    assert NavSection.from_nav(nav).to_nav() == nav
+
+
+def test_find_creates_nested_sections_once():
+    root = NavSection()
+    root.find(["team", "build"]).add_page("lint", "lint.md")
+    root.find(["team", "build"]).add_page("test", "test.md")
+    root.find(["team"]).add_page("deploy", "deploy.md")
+
+    assert root.to_nav() == [
+        {
+            "team": [
+                {"build": [{"lint": "lint.md"}, {"test": "test.md"}]},
+                {"deploy": "deploy.md"},
+            ]
+        }
+    ]
+
+
+def test_find_reuses_sections_from_existing_nav():
+    root = NavSection.from_nav([{"team": [{"old": "old.md"}]}])
+    root.find(["team"]).add_page("new", "new.md")
+    assert root.to_nav() == [{"team": [{"old": "old.md"}, {"new": "new.md"}]}]
+
+
+def test_add_versions_extends_existing_entry():
+    root = NavSection()
+    root.add_versions("build", [("build v2", "v2.md")])
+    root.add_versions("build", [("build v1", "v1.md")])
+    assert root.to_nav() == [{"build": [{"build v2": "v2.md"}, {"build v1": "v1.md"}]}]
+
+
+def test_find_sections_returns_first_empty_section():
+    pipelines = []
+    tasks = []
+    nav = [
+        {"Pipelines": "pipelines.md"},
+        {"Docs": [{"Pipelines": pipelines}, {"Tasks": tasks}]},
+        {"Tasks": []},
+    ]
+    sections = find_sections(nav, ["Pipelines", "Tasks", "Missing"])
+    assert sections["Pipelines"] is pipelines
+    assert sections["Tasks"] is tasks
+    assert "Missing" not in sections
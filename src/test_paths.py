@@ -0,0 +1,45 @@
+import pytest
+from .paths import compile_path_filter
+
+
+@pytest.mark.parametrize(
+    "path, included",
+    [
+        ("pipelines/build.yaml", True),
+        ("pipelines/nested/build.yml", True),
+        ("pipelines/fixtures/build.yaml", False),
+        ("pipelines/deep/fixtures/x/build.yaml", False),
+        ("pipelines/build-test.yaml", False),
+        ("tasks/lint.yaml", True),
+        ("tasks/nested/lint.yaml", False),
+        ("charts/vendor/values.yaml", False),
+        ("other/build.yaml", False),
+    ],
+)
+def test_path_filter(path, included):
+    matches = compile_path_filter(
+        ["pipelines/**", "tasks/*.yaml"], ["**/fixtures", "*-test.yaml", "vendor"]
+    )
+
+    assert matches(path) is included
+
+
+def test_path_filter_includes_everything_by_default():
+    matches = compile_path_filter()
+
+    assert matches("a/b/c.yaml")
+
+
+@pytest.mark.parametrize(
+    "pattern, path, included",
+    [
+        ("task-?.yaml", "task-1.yaml", False),
+        ("task-?.yaml", "task-10.yaml", True),
+        ("task-[0-4].yaml", "dir/task-3.yaml", False),
+        ("task-[!0-4].yaml", "dir/task-3.yaml", True),
+        ("a.b/*", "a.b/c.yaml", False),
+        ("a.b/*", "axb/c.yaml", True),
+    ],
+)
+def test_path_filter_exclude_syntax(pattern, path, included):
+    assert compile_path_filter(exclude=[pattern])(path) is included
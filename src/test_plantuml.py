@@ -0,0 +1,77 @@
+import sys
+import pytest
+from mkdocs.structure.files import File, Files
+from .plantuml import PlantUMLRenderer
+from .visualizer import PipelineVisualizer
+
+FAKE_PLANTUML = """
+import sys
+args = sys.argv[1:]
+delimiter = args[args.index("-pipedelimitor") + 1]
+with open(sys.argv[1], "a") as log:
+    log.write("run\\n")
+for diagram in sys.stdin.read().split("@enduml")[:-1]:
+    name = diagram.strip().splitlines()[-1]
+    sys.stdout.write('<?xml version="1.0"?><svg>' + name + "</svg>\\n" + delimiter + "\\n")
+"""
+
+
+@pytest.fixture
+def plantuml_command(tmp_path):
+    script = tmp_path / "plantuml.py"
+    script.write_text(FAKE_PLANTUML)
+    return f"{sys.executable} {script} {tmp_path / 'runs.log'}"
+
+
+def test_render_batches_and_caches(tmp_path, plantuml_command):
+    sources = [f"@startuml\nA --> B{i}\n@enduml\n" for i in range(5)]
+    renderer = PlantUMLRenderer(plantuml_command, 2, str(tmp_path / "cache"))
+
+    svgs = renderer.render(sources + sources[:1])
+
+    assert svgs[sources[3]] == "<svg>A --> B3</svg>"
+    assert renderer.rendered == 5
+    assert (tmp_path / "runs.log").read_text().count("run") == 2
+
+    renderer = PlantUMLRenderer(plantuml_command, 2, str(tmp_path / "cache"))
+    assert renderer.render(sources) == svgs
+    assert renderer.cached == 5
+    assert (tmp_path / "runs.log").read_text().count("run") == 2
+
+
+def test_render_failure_is_reported(tmp_path):
+    renderer = PlantUMLRenderer("does-not-exist", 1, str(tmp_path))
+
+    assert renderer.render(["@startuml\n@enduml\n"]) == {}
+
+
+def _build_pipeline_page(tmp_path, plantuml_command):
+    plugin = PipelineVisualizer()
+    plugin.load_config(
+        {
+            "plantuml_command": plantuml_command,
+            "cache_dir": str(tmp_path / "cache"),
+            "markdown_output": "memory",
+        }
+    )
+    plugin.on_config({})
+    (tmp_path / "pipeline.yaml").write_text(
+        "kind: Pipeline\nmetadata:\n  name: p\nspec:\n  tasks:\n    - name: build\n"
+    )
+    yaml_file = File("pipeline.yaml", str(tmp_path), str(tmp_path / "site"), False)
+    files = plugin.on_files(Files([yaml_file]), {"site_dir": "", "nav": []})
+    return files.get_file_from_path("pipeline.md").content_string
+
+
+def test_pipeline_graph_rendered_to_svg(tmp_path, plantuml_command):
+    content = _build_pipeline_page(tmp_path, plantuml_command)
+
+    assert '<div class="pipeline-graph"><svg>"Start" --> "build"</svg></div>' in content
+    assert "```plantuml" not in content
+
+
+def test_pipeline_graph_falls_back_to_plantuml_block(tmp_path):
+    content = _build_pipeline_page(tmp_path, "does-not-exist")
+
+    assert "```plantuml\n@startuml\n" in content
+    assert "pipeline-visualizer:diagram" not in content
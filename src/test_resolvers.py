@@ -0,0 +1,82 @@
+import os
+import pytest
+import yaml
+from .resolvers import ResolverCache, bundle_path, git_path, hub_path, resolver_key
+
+
+@pytest.mark.parametrize(
+    "make_path, params, path",
+    [
+        (
+            bundle_path,
+            {"bundle": "registry.example.com/catalog:1.0", "name": "build"},
+            ["bundles", "registry.example.com", "catalog", "1.0.yaml"],
+        ),
+        (
+            bundle_path,
+            {"bundle": "registry:5000/catalog@sha256:abc"},
+            ["bundles", "registry_5000", "catalog", "sha256_abc.yaml"],
+        ),
+        (
+            git_path,
+            {
+                "url": "https://github.com/org/repo.git",
+                "revision": "v1",
+                "pathInRepo": "tasks/lint.yaml",
+            },
+            ["git", "github.com", "org", "repo", "v1", "tasks", "lint.yaml"],
+        ),
+        (
+            git_path,
+            {"url": "git@github.com:org/repo.git", "pathInRepo": "../../lint.yaml"},
+            ["git", "github.com", "org", "repo", "main", "lint.yaml"],
+        ),
+        (
+            git_path,
+            {"org": "org", "repo": "repo", "pathInRepo": "lint.yaml"},
+            ["git", "org", "repo", "main", "lint.yaml"],
+        ),
+        (git_path, {"url": "https://github.com/org/repo.git"}, None),
+        (
+            hub_path,
+            {"name": "git-clone", "version": "0.9"},
+            ["hub", "tekton", "task", "git-clone", "0.9", "git-clone.yaml"],
+        ),
+        (hub_path, {"name": "git-clone"}, None),
+    ],
+)
+def test_resolver_paths(make_path, params, path):
+    assert make_path(params) == path
+
+
+def _task(name, version=None):
+    metadata = {"name": name}
+    if version:
+        metadata["labels"] = {"app.kubernetes.io/version": version}
+    return {"kind": "Task", "metadata": metadata, "spec": {"steps": []}}
+
+
+def test_resolver_cache_memoizes_references(tmp_path):
+    bundle = tmp_path / "bundles" / "registry.example.com" / "catalog" / "1.0.yaml"
+    bundle.parent.mkdir(parents=True)
+    bundle.write_text(yaml.safe_dump_all([_task("lint"), _task("build", "1.0")]))
+    cache = ResolverCache(str(tmp_path))
+    params = [["bundle", "registry.example.com/catalog:1.0"], ["name", "build"]]
+
+    assert cache.resolve("bundles", params) == _task("build", "1.0")
+    assert cache.resolve("bundles", [list(p) for p in params]) == _task("build", "1.0")
+    assert cache.files_loaded == 1
+    assert cache.resolve("bundles", [params[0], ["name", "missing"]]) is None
+    assert cache.resolve("hub", [["name", "lint"], ["version", "0.1"]]) is None
+    assert cache.resolve("cluster", [["name", "lint"]]) is None
+    assert cache.resolve("bundles", [["bundle", "$(params.bundle)"]]) is None
+    assert cache.files_loaded == 2
+    assert cache.path("git", {"pathInRepo": "lint.yaml"}) is None
+    assert cache.path("hub", {"name": "lint", "version": "0.1"}) == os.path.join(
+        str(tmp_path), "hub", "tekton", "task", "lint", "0.1", "lint.yaml"
+    )
+
+
+def test_resolver_key_depends_on_resolver():
+    assert resolver_key("hub", [["name", "a"]]) == resolver_key("hub", [["name", "a"]])
+    assert resolver_key("hub", [["name", "a"]]) != resolver_key("git", [["name", "a"]])
@@ -0,0 +1,47 @@
+from .stats import NULL_STATS, BuildStats
+
+
+def test_phases_and_counters_add_up():
+    stats = BuildStats()
+    with stats.phase("parse"):
+        pass
+    stats.add_time("parse", 1.0)
+    stats.count("files_seen", 2)
+    stats.count("files_seen")
+
+    assert stats.phases["parse"][0] >= 1.0
+    assert stats.phases["parse"][1] == 2
+    assert stats.counters == {"files_seen": 3}
+
+
+def test_slowest_files_keeps_the_slowest():
+    stats = BuildStats(slowest=2)
+    for i, seconds in enumerate([0.3, 0.1, 0.5, 0.2]):
+        stats.file_time(f"file-{i}.yaml", seconds)
+    assert stats.slowest_files() == [("file-2.yaml", 0.5), ("file-0.yaml", 0.3)]
+
+
+def test_merge_worker_stats():
+    stats = BuildStats(slowest=1)
+    stats.add_time("render", 1.0)
+    stats.file_time("a.yaml", 1.0)
+    worker = BuildStats()
+    worker.add_time("render", 2.0)
+    worker.count("bytes_read", 10)
+    worker.file_time("b.yaml", 2.0)
+
+    stats.merge(worker)
+
+    assert stats.to_dict() == {
+        "phases": {"render": {"seconds": 3.0, "calls": 2}},
+        "counters": {"bytes_read": 10},
+        "slowest_files": [{"path": "b.yaml", "seconds": 2.0}],
+    }
+
+
+def test_null_stats_records_nothing():
+    with NULL_STATS.phase("parse"):
+        NULL_STATS.count("files_seen")
+        NULL_STATS.file_time("a.yaml", 1.0)
+    assert not NULL_STATS.enabled
+    assert not hasattr(NULL_STATS, "phases")
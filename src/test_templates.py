@@ -0,0 +1,64 @@
+import pytest
+import jinja2
+from .model import load_resource
+from .templates import PageTemplates
+
+
+def test_directory_overrides_default_templates(tmp_path):
+    (tmp_path / "task.md.j2").write_text("Task {{ task_name }}\n")
+    defaults = PageTemplates()
+    templates = PageTemplates(str(tmp_path))
+
+    assert templates.task.render(task_name="build") == "Task build\n"
+    assert templates.pipeline.filename == defaults.pipeline.filename
+    assert templates.digest != defaults.digest
+
+
+def test_env_partial_is_shared_by_pipeline_and_task_pages(tmp_path):
+    (tmp_path / "env.md.j2").write_text(
+        "{% for var in env %}ENV {{ var.name }}\n{% endfor %}"
+    )
+    templates = PageTemplates(str(tmp_path))
+    env = [{"name": "GREETING", "value": "hello"}]
+    pipeline = load_resource(
+        {
+            "kind": "Pipeline",
+            "metadata": {"name": "greet"},
+            "spec": {
+                "tasks": [{"name": "say", "taskRef": {"name": "echo"}, "env": env}]
+            },
+        }
+    )
+    task = load_resource(
+        {
+            "kind": "Task",
+            "metadata": {"name": "echo"},
+            "spec": {"steps": [{"name": "echo", "image": "alpine", "env": env}]},
+        }
+    )
+
+    pipeline_page = templates.pipeline.render(
+        pipeline=pipeline, graph=lambda: "", task_ref=lambda task, name: name
+    )
+    task_page = templates.task.render(
+        task=task, task_name="echo", usage="", used_by=lambda name: ""
+    )
+    assert "ENV GREETING\n" in pipeline_page
+    assert "ENV GREETING\n" in task_page
+    assert "| Name | Value | Source | Optional |" not in pipeline_page + task_page
+
+
+def test_digest_follows_template_changes(tmp_path):
+    template = tmp_path / "pipeline.md.j2"
+    template.write_text("one\n")
+    digest = PageTemplates(str(tmp_path)).digest
+    template.write_text("two\n")
+
+    assert PageTemplates(str(tmp_path)).digest != digest
+
+
+def test_invalid_template_raises(tmp_path):
+    (tmp_path / "task.md.j2").write_text("{% if %}")
+
+    with pytest.raises(jinja2.TemplateError):
+        PageTemplates(str(tmp_path))
@@ -1,7 +1,14 @@
 import pytest
+from mkdocs.commands.build import build as build_site
+from mkdocs.config import load_config
 from mkdocs.structure.files import File, Files
-from .visualizer import PipelineVisualizer
+from .visualizer import SNIFF_SIZE, PipelineVisualizer, version_sort_key
+from .writer import MarkdownWriter
+from .model import PipelineTask
 import os
+import yaml
+import json
+import datetime
 import logging
 
 
@@ -32,6 +39,7 @@ def test_default_config_options(plugin, mock_config):
     assert plugin.nav_pipeline_grouping_offset == None
     assert plugin.nav_task_grouping_offset == None
     assert plugin.logger.level == logging.INFO
+    assert plugin.yaml_loader is getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def test_custom_config_options(plugin):
@@ -343,3 +351,1055 @@ def test_add_to_versions_with_invalid_grouping_offset(plugin):
     assert pipeline_versions[""]["grouped-pipeline"] == [
         ("1.0.0", os.path.normpath("group1/group2/pipelines/grouped-pipeline.md"))
     ]
+
+
+def test_render_cache_skips_parsing_on_hit(plugin, mock_config, tmp_path):
+    plugin.load_config(
+        {"cache": True, "cache_dir": str(tmp_path / "cache"), "nav_generation": False}
+    )
+    plugin.on_config(mock_config)
+    (tmp_path / "docs").mkdir()
+    yaml_file = tmp_path / "docs" / "task.yaml"
+    yaml_file.write_text("kind: Task\nmetadata:\n  name: cached-task\n")
+    mock_file = File(
+        path="task.yaml",
+        src_dir=str(tmp_path / "docs"),
+        dest_dir=str(tmp_path / "site"),
+        use_directory_urls=False,
+    )
+
+    plugin.on_files(Files([mock_file]), mock_config)
+    assert plugin.render_cache.misses == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache hit should not parse YAML")
+
+    # A new build in a fresh process only has the on-disk cache
+    plugin = PipelineVisualizer()
+    plugin.load_config(
+        {"cache": True, "cache_dir": str(tmp_path / "cache"), "nav_generation": False}
+    )
+    plugin.on_config(mock_config)
+    plugin._load_yaml = fail
+    plugin._write_markdown_content = fail
+    new_files = plugin.on_files(Files([mock_file]), mock_config)
+
+    assert plugin.render_cache.hits == 1
+    md_content = (tmp_path / "docs" / "task.md").read_text()
+    assert "# Task: cached-task" in md_content
+    assert [f.src_path for f in new_files] == ["task.md"]
+
+
+def test_render_cache_stores_date_versions(plugin, mock_config, tmp_path):
+    plugin.load_config({"cache": True, "cache_dir": str(tmp_path / "cache")})
+    plugin.on_config(mock_config)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "task.yaml").write_text(
+        "kind: Task\nmetadata:\n  name: dated\n"
+        "  labels:\n    app.kubernetes.io/version: 2024-01-31\n"
+    )
+    mock_file = File("task.yaml", str(tmp_path / "docs"), str(tmp_path / "site"), False)
+
+    plugin.on_files(Files([mock_file]), mock_config)
+
+    md_content = (tmp_path / "docs" / "task.md").read_text()
+    assert md_content.startswith("# Task: dated v2024-01-31\n")
+    assert plugin.task_versions[""]["dated"] == [("2024-01-31", "task.md")]
+    cached = [
+        name
+        for _, _, names in os.walk(tmp_path / "cache")
+        for name in names
+        if name.endswith(".json")
+    ]
+    assert len(cached) == 1
+
+
+def _write_task(path, name, version="1.0"):
+    path.write_text(
+        f"kind: Task\nmetadata:\n  name: {name}\n"
+        f"  labels:\n    app.kubernetes.io/version: '{version}'\n"
+    )
+
+
+def test_incremental_rebuild_only_renders_changed_files(plugin, tmp_path):
+    plugin.load_config({})
+    plugin.on_config({})
+    for name in ["task-a", "task-b"]:
+        _write_task(tmp_path / f"{name}.yaml", name)
+    yaml_files = [
+        File(f"{name}.yaml", str(tmp_path), str(tmp_path / "site"), False)
+        for name in ["task-a", "task-b"]
+    ]
+
+    config = {"site_dir": "", "nav": []}
+    plugin.on_files(Files(list(yaml_files)), config)
+
+    rendered = []
+    generate = plugin._write_markdown_content
+
+    def track(out, resources):
+        rendered.append(resources[0].name)
+        return generate(out, resources)
+
+    plugin._write_markdown_content = track
+    _write_task(tmp_path / "task-b.yaml", "task-b", "2.0")
+    os.utime(tmp_path / "task-b.yaml", ns=(0, 0))
+
+    # mkdocs discovers the pages written by the previous build
+    md_files = [
+        File(f"{name}.md", str(tmp_path), str(tmp_path / "site"), False)
+        for name in ["task-a", "task-b"]
+    ]
+    plugin.on_config({})
+    new_files = plugin.on_files(Files(yaml_files + md_files), config)
+
+    assert rendered == ["task-b"]
+    assert sorted(f.src_path for f in new_files) == ["task-a.md", "task-b.md"]
+    assert plugin.task_versions[""]["task-b"] == [("2.0", "task-b.md")]
+    assert config["nav"] == [
+        {"Pipelines": []},
+        {"Tasks": [{"task-a": "task-a.md"}, {"task-b": "task-b.md"}]},
+    ]
+
+
+def test_incremental_rebuild_drops_deleted_files(plugin, tmp_path):
+    plugin.load_config({})
+    plugin.on_config({})
+    _write_task(tmp_path / "task-a.yaml", "task-a")
+    yaml_file = File("task-a.yaml", str(tmp_path), str(tmp_path / "site"), False)
+    config = {"site_dir": "", "nav": []}
+    plugin.on_files(Files([yaml_file]), config)
+
+    plugin.on_config({})
+    plugin.on_files(Files([]), config)
+
+    assert plugin.task_versions == {}
+    assert plugin.resource_index == {}
+    assert config["nav"] == [{"Pipelines": []}, {"Tasks": []}]
+
+
+def test_rebuild_with_fresh_nav_reuses_unchanged_sections(plugin, tmp_path):
+    plugin.load_config({})
+    plugin.on_config({})
+    _write_task(tmp_path / "task-a.yaml", "task-a")
+    yaml_file = File("task-a.yaml", str(tmp_path), str(tmp_path / "site"), False)
+    md_file = File("task-a.md", str(tmp_path), str(tmp_path / "site"), False)
+    plugin.on_files(Files([yaml_file]), {"site_dir": "", "nav": []})
+
+    built = []
+    add_to_nav = plugin._add_to_nav
+    plugin._add_to_nav = lambda *args: built.append(args) or add_to_nav(*args)
+    expected = [{"Pipelines": []}, {"Tasks": [{"task-a": "task-a.md"}]}]
+
+    # `mkdocs serve` loads the config, and with it the nav, again on every rebuild
+    for _ in range(2):
+        config = {"site_dir": "", "nav": []}
+        plugin.on_config({})
+        plugin.on_files(Files([yaml_file, md_file]), config)
+        assert config["nav"] == expected
+    assert built == []
+
+    _write_task(tmp_path / "task-a.yaml", "task-a", "2.0")
+    os.utime(tmp_path / "task-a.yaml", ns=(0, 0))
+    config = {"site_dir": "", "nav": []}
+    plugin.on_config({})
+    plugin.on_files(Files([yaml_file, md_file]), config)
+    assert len(built) == 2
+    assert config["nav"] == expected
+    assert plugin.task_versions[""]["task-a"] == [("2.0", "task-a.md")]
+
+
+def test_parallel_rendering_matches_serial(tmp_path):
+    names = [f"task-{i}" for i in range(6)]
+    for name in names:
+        _write_task(tmp_path / f"{name}.yaml", name)
+
+    results = []
+    for workers in [1, 3]:
+        plugin = PipelineVisualizer()
+        plugin.load_config({"workers": workers})
+        plugin.on_config({})
+        rendered = plugin._render_yaml_files(
+            [str(tmp_path / f"{name}.yaml") for name in names]
+        )
+        results.append(list(rendered.items()))
+
+    assert results[0] == results[1]
+    assert [record["name"] for _, (record, _) in results[1]] == names
+
+
+def test_yaml_loader_selection(plugin, monkeypatch):
+    plugin.load_config({"yaml_loader": "python"})
+    plugin.on_config({})
+    assert plugin.yaml_loader is yaml.SafeLoader
+
+    monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+    plugin.load_config({"yaml_loader": "c"})
+    plugin.on_config({})
+    assert plugin.yaml_loader is yaml.SafeLoader
+
+
+@pytest.mark.parametrize(
+    "content, kind",
+    [
+        ("apiVersion: tekton.dev/v1\nkind: Task\nmetadata: {}\n", "task"),
+        ("# comment\n---\nkind: 'Pipeline'  # trailing\n", "pipeline"),
+        ("image:\n  kind: Task\nreplicas: 1\n", ""),
+        ("replicas: 1\n---\nkind: Task\n", ""),
+        ("kind: ConfigMap\n---\nkind: Task\n", "configmap"),
+        ('{"kind": "Task"}\n', None),
+        ("kind: Pipeline: content", None),
+    ],
+)
+def test_sniff_kind(plugin, tmp_path, content, kind):
+    yaml_file = tmp_path / "file.yaml"
+    yaml_file.write_text(content)
+
+    assert plugin._sniff_kind(str(yaml_file)) == kind
+
+
+def test_non_tekton_file_is_skipped_without_parsing(plugin, tmp_path):
+    plugin.load_config({})
+    plugin.on_config({})
+    yaml_file = tmp_path / "values.yaml"
+    yaml_file.write_text("kind: ConfigMap\ndata:\n" + "  key: value\n" * 10000)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("non Tekton file should not be parsed")
+
+    plugin._load_yaml = fail
+    record, _ = plugin._render_yaml_file(str(yaml_file))
+
+    assert record == {"kind": None}
+
+
+def test_large_file_without_kind_is_skipped_without_parsing(plugin, tmp_path):
+    plugin.load_config({})
+    plugin.on_config({})
+    spec = tmp_path / "openapi.yaml"
+    spec.write_text("openapi: 3.0.0\npaths:\n" + "  /items: {get: {}}\n" * 5000)
+    task = tmp_path / "task.yaml"
+    task.write_text(
+        "metadata:\n  name: late\n  annotations:\n"
+        + "".join(f"    a{i}: value\n" for i in range(5000))
+        + "kind: Task\n"
+    )
+    quoted = tmp_path / "quoted.yaml"
+    quoted.write_text('"openapi": 3.0.0\n' + spec.read_text())
+    assert os.path.getsize(spec) > SNIFF_SIZE
+    assert os.path.getsize(task) > SNIFF_SIZE
+    assert plugin._sniff_kind(str(spec)) == ""
+    assert plugin._sniff_kind(str(task)) == ""
+    # Quoted keys are left to the parser
+    assert plugin._sniff_kind(str(quoted)) is None
+
+    load_yaml = plugin._load_yaml
+    loaded = []
+    plugin._load_yaml = lambda *args, **kwargs: loaded.append(args) or load_yaml(
+        *args, **kwargs
+    )
+    assert plugin._render_yaml_file(str(spec))[0] == {"kind": None}
+    assert loaded == []
+    assert plugin._render_yaml_file(str(task))[0]["name"] == "late"
+
+
+def test_max_file_size_guard(plugin, tmp_path, caplog):
+    plugin.load_config({"max_file_size": 1})
+    plugin.on_config({})
+    yaml_file = tmp_path / "big.yaml"
+    yaml_file.write_text("kind: Task\nmetadata:\n  name: big\n" + "#" * 1024 * 1024)
+
+    record, _ = plugin._render_yaml_file(str(yaml_file))
+
+    assert record is None
+    assert "exceeds max_file_size" in caplog.text
+
+
+def test_memory_output_does_not_write_to_docs_dir(plugin, tmp_path):
+    plugin.load_config({"markdown_output": "memory"})
+    plugin.on_config({})
+    _write_task(tmp_path / "task-a.yaml", "task-a")
+    yaml_file = File("task-a.yaml", str(tmp_path), str(tmp_path / "site"), False)
+
+    new_files = plugin.on_files(Files([yaml_file]), {"site_dir": "", "nav": []})
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["task-a.yaml"]
+    md_file = new_files.get_file_from_path("task-a.md")
+    assert "# Task: task-a v1.0" in md_file.content_string
+
+
+def test_memory_output_staging_fallback(plugin, tmp_path, monkeypatch):
+    monkeypatch.setattr("src.visualizer._IN_MEMORY_FILES", False)
+    plugin.load_config({"markdown_output": "memory"})
+    plugin.on_config({})
+    _write_task(tmp_path / "task-a.yaml", "task-a")
+    yaml_file = File("task-a.yaml", str(tmp_path), str(tmp_path / "site"), False)
+
+    new_files = plugin.on_files(Files([yaml_file]), {"site_dir": "", "nav": []})
+    md_file = new_files.get_file_from_path("task-a.md")
+
+    assert not (tmp_path / "task-a.md").exists()
+    assert not md_file.abs_src_path.startswith(str(tmp_path))
+    with open(md_file.abs_src_path) as f:
+        assert "# Task: task-a v1.0" in f.read()
+    plugin.on_shutdown()
+    assert not os.path.exists(md_file.abs_src_path)
+
+
+def test_unchanged_markdown_is_not_rewritten(plugin, tmp_path):
+    plugin.load_config({})
+    plugin.on_config({})
+    _write_task(tmp_path / "task-a.yaml", "task-a")
+    yaml_file = File("task-a.yaml", str(tmp_path), str(tmp_path / "site"), False)
+    config = {"site_dir": "", "nav": []}
+
+    plugin.on_files(Files([yaml_file]), config)
+    assert plugin.files_written == 1
+    md_path = tmp_path / "task-a.md"
+    os.utime(md_path, ns=(0, 0))
+
+    # A fresh plugin renders again, the content on disk is identical
+    plugin = PipelineVisualizer()
+    plugin.load_config({})
+    plugin.on_config({})
+    plugin.on_files(Files([yaml_file]), config)
+
+    assert plugin.files_written == 0
+    assert plugin.files_unchanged == 1
+    assert md_path.stat().st_mtime_ns == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["task-a.md", "task-a.yaml"]
+
+
+def test_written_markdown_follows_umask(plugin, tmp_path):
+    umask = os.umask(0o027)
+    try:
+        plugin._write_if_changed(str(tmp_path / "page.md"), "# Page\n")
+    finally:
+        os.umask(umask)
+
+    assert (tmp_path / "page.md").stat().st_mode & 0o777 == 0o640
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["page.md"]
+
+
+def test_svg_graph_backend(plugin):
+    plugin.load_config({"graph_backend": "svg", "plantuml_graph_direction": "LR"})
+    plugin.on_config({})
+    content = plugin._generate_markdown_content(
+        [
+            {
+                "kind": "Pipeline",
+                "metadata": {"name": "p"},
+                "spec": {
+                    "tasks": [{"name": "a"}, {"name": "b", "runAfter": ["a"]}],
+                    "finally": [{"name": "cleanup"}],
+                },
+            }
+        ]
+    )
+
+    assert '<div class="pipeline-graph"><svg' in content
+    assert "```plantuml" not in content
+
+
+def test_svg_graph_backend_numeric_task_names(plugin, caplog):
+    plugin.load_config({"graph_backend": "svg"})
+    plugin.on_config({})
+    pipeline = yaml.safe_load(
+        "kind: Pipeline\nmetadata:\n  name: p\nspec:\n"
+        "  tasks:\n  - name: 1\n  - name: 2\n    runAfter: [1]\n"
+    )
+    content = plugin._generate_markdown_content([pipeline])
+
+    assert '<div class="pipeline-graph"><svg' in content
+    assert ">1</text>" in content and ">2</text>" in content
+    assert "runs after unknown task" not in caplog.text
+
+
+def test_plantuml_graph_is_transitively_reduced(plugin, caplog):
+    plugin.load_config({})
+    plugin.on_config({})
+    tasks = [
+        PipelineTask({"name": "a"}),
+        PipelineTask({"name": "b", "runAfter": ["a"]}),
+        PipelineTask({"name": "c", "runAfter": ["a", "b", "missing"]}),
+    ]
+    out = MarkdownWriter()
+    plugin._make_graph_from_tasks(out, tasks, [PipelineTask({"name": "cleanup"})])
+    content = out.getvalue()
+
+    assert '"a" --> "b"\n"b" --> "c"\n' in content
+    assert '"a" --> "c"' not in content
+    assert '"missing" --> "c"' in content
+    assert '"c" --> "cleanup"' in content
+    assert "runs after unknown task 'missing'" in caplog.text
+
+
+def test_version_sort_key_orders_labels():
+    labels = ["", "2024-01-31", "1.10.0", "1.9.0-rc.1", "1.9.0", "2024-02-01", "v2"]
+    labels += ["release-10", "release-9"]
+    assert sorted(labels, key=version_sort_key, reverse=True) == [
+        "v2",
+        "1.10.0",
+        "1.9.0",
+        "1.9.0-rc.1",
+        "2024-02-01",
+        "2024-01-31",
+        "release-10",
+        "release-9",
+        "",
+    ]
+
+
+def test_nav_max_versions_adds_index_page(plugin, tmp_path):
+    plugin.load_config({"markdown_output": "memory", "nav_max_versions": 2})
+    plugin.on_config({})
+    files = []
+    for v in ["1.0", "1.2", "1.10"]:
+        _write_task(tmp_path / f"task-a-{v}.yaml", "task-a", v)
+        files.append(
+            File(f"task-a-{v}.yaml", str(tmp_path), str(tmp_path / "site"), False)
+        )
+    config = {
+        "docs_dir": str(tmp_path),
+        "site_dir": "",
+        "use_directory_urls": False,
+        "nav": [],
+    }
+
+    new_files = plugin.on_files(Files(files), config)
+
+    assert config["nav"] == [
+        {"Pipelines": []},
+        {
+            "Tasks": [
+                {
+                    "task-a": [
+                        {"task-a v1.10": "task-a-1.10.md"},
+                        {"task-a v1.2": "task-a-1.2.md"},
+                        {"All versions": "task-a-versions.md"},
+                    ]
+                }
+            ]
+        },
+    ]
+    index_page = new_files.get_file_from_path("task-a-versions.md").content_string
+    assert index_page.index("(task-a-1.2.md)") < index_page.index("(task-a-1.0.md)")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_timing_report(plugin, tmp_path, workers):
+    plugin.load_config({"timing_report": "reports/timing.json", "workers": workers})
+    plugin.on_config({})
+    _write_task(tmp_path / "task-a.yaml", "task-a")
+    _write_task(tmp_path / "task-b.yaml", "task-b")
+    (tmp_path / "other.yaml").write_text("kind: ConfigMap\n")
+    files = [
+        File(name, str(tmp_path), str(tmp_path / "site"), False)
+        for name in ["task-a.yaml", "task-b.yaml", "other.yaml"]
+    ]
+    config = {"site_dir": str(tmp_path / "site"), "nav": []}
+
+    plugin.on_files(Files(files), config)
+    plugin.on_post_build(config)
+
+    with open(tmp_path / "site" / "reports" / "timing.json") as f:
+        report = json.load(f)
+    assert {"on_files", "lookup", "parse", "render", "write", "navigation"} <= set(
+        report["phases"]
+    )
+    assert report["counters"]["files_seen"] == 3
+    assert report["counters"]["files_rendered"] == 2
+    assert report["counters"]["files_skipped"] == 1
+    assert report["counters"]["bytes_written"] > 0
+    assert len(report["slowest_files"]) == 2
+
+
+def test_timing_off_uses_null_stats(plugin, tmp_path):
+    plugin.load_config({})
+    plugin.on_config({})
+    _write_task(tmp_path / "task-a.yaml", "task-a")
+    yaml_file = File("task-a.yaml", str(tmp_path), str(tmp_path / "site"), False)
+    config = {"site_dir": str(tmp_path / "site"), "nav": []}
+
+    plugin.on_files(Files([yaml_file]), config)
+    plugin.on_post_build(config)
+
+    assert not plugin.stats.enabled
+    assert not (tmp_path / "site").exists()
+
+
+def _write_pipeline(path, name, task_refs):
+    tasks = [{"name": f"run-{i}", "taskRef": ref} for i, ref in enumerate(task_refs)]
+    path.write_text(
+        yaml.safe_dump(
+            {"kind": "Pipeline", "metadata": {"name": name}, "spec": {"tasks": tasks}}
+        )
+    )
+
+
+def test_task_refs_link_to_task_pages(plugin, tmp_path):
+    plugin.load_config({"markdown_output": "memory", "timing": True})
+    plugin.on_config({})
+    (tmp_path / "tasks").mkdir()
+    _write_task(tmp_path / "tasks" / "build-1.yaml", "build", "1.0")
+    _write_task(tmp_path / "tasks" / "build-2.yaml", "build", "2.0")
+    _write_pipeline(
+        tmp_path / "pipeline.yaml",
+        "ci",
+        [
+            {"name": "build"},
+            {
+                "resolver": "hub",
+                "params": [
+                    {"name": "name", "value": "build"},
+                    {"name": "version", "value": "1.0"},
+                ],
+            },
+            {
+                "resolver": "hub",
+                # Written unquoted, parsed as a float
+                "params": [
+                    {"name": "name", "value": "build"},
+                    {"name": "version", "value": 1.0},
+                ],
+            },
+            {"name": "missing"},
+            {"name": "custom", "kind": "CustomRun"},
+        ],
+    )
+    files = [
+        File(name, str(tmp_path), str(tmp_path / "site"), False)
+        for name in ["pipeline.yaml", "tasks/build-1.yaml", "tasks/build-2.yaml"]
+    ]
+
+    new_files = plugin.on_files(Files(files), {"site_dir": "", "nav": []})
+
+    page = new_files.get_file_from_path("pipeline.md").content_string
+    assert "**Task Reference:** [`build`](tasks/build-2.md)" in page
+    assert page.count("**Task Reference:** [`build`](tasks/build-1.md)") == 2
+    assert "**Task Reference:** `missing`" in page
+    assert "**Task Reference:** `custom`" in page
+    assert plugin.stats.counters["refs_resolved"] == 3
+    assert plugin.stats.counters["refs_unresolved"] == 1
+
+
+def test_resolver_refs_link_to_resolved_tasks(plugin, tmp_path):
+    resolved = tmp_path / "resolved-cache"
+    hub = resolved / "hub" / "tekton" / "task" / "git-clone" / "0.9"
+    hub.mkdir(parents=True)
+    _write_task(hub / "git-clone.yaml", "git-clone", "0.9")
+    git = resolved / "git" / "github.com" / "org" / "repo" / "main" / "tasks"
+    git.mkdir(parents=True)
+    _write_task(git / "lint.yaml", "lint")
+    docs = tmp_path / "docs"
+    (docs / "tasks").mkdir(parents=True)
+    _write_task(docs / "tasks" / "lint.yaml", "lint")
+    hub_ref = {
+        "resolver": "hub",
+        "params": [
+            {"name": "name", "value": "git-clone"},
+            {"name": "version", "value": "0.9"},
+        ],
+    }
+    git_params = [
+        {"name": "url", "value": "https://github.com/org/repo.git"},
+        {"name": "pathInRepo", "value": "tasks/lint.yaml"},
+    ]
+    _write_pipeline(
+        docs / "ci.yaml",
+        "ci",
+        [
+            hub_ref,
+            hub_ref,
+            {"resolver": "git", "params": git_params},
+            {"resolver": "git", "params": git_params[:1]},
+        ],
+    )
+    _write_pipeline(docs / "release.yaml", "release", [hub_ref])
+    plugin.load_config(
+        {
+            "markdown_output": "memory",
+            "timing": True,
+            "resolver_cache_dir": str(resolved),
+        }
+    )
+    plugin.on_config({})
+    files = [
+        File(name, str(docs), str(tmp_path / "site"), False)
+        for name in ["ci.yaml", "release.yaml", "tasks/lint.yaml"]
+    ]
+    config = {"docs_dir": str(docs), "site_dir": "", "use_directory_urls": False}
+
+    new_files = plugin.on_files(Files(files), dict(config, nav=[]))
+
+    page = new_files.get_file_from_path("ci.md").content_string
+    assert "**Task Reference:** [`git-clone`](resolved/hub/git-clone.md)" in page
+    assert "**Task Reference:** [`lint`](tasks/lint.md)" in page
+    assert "**Task Reference:** `Not specified`" in page
+    resolved_page = new_files.get_file_from_path("resolved/hub/git-clone.md")
+    assert resolved_page.content_string.startswith("# Task: git-clone v0.9\n")
+    assert "| [ci](../../ci.md) | `run-0`, `run-1` |" in resolved_page.content_string
+    assert "| [release](../../release.md) | `run-0` |" in resolved_page.content_string
+    assert plugin.stats.counters["resolver_files_loaded"] == 2
+    assert plugin.stats.counters["refs_resolved"] == 4
+    assert plugin.stats.counters["refs_unresolved"] == 1
+    assert plugin.task_versions[""]["git-clone"] == [
+        ("0.9", "resolved/hub/git-clone.md")
+    ]
+
+    # The resolver cache is read again by the next build
+    _write_task(hub / "git-clone.yaml", "git-clone", "1.0")
+    plugin.on_files(Files(files), dict(config, nav=[]))
+    assert plugin.task_versions[""]["git-clone"] == [
+        ("1.0", "resolved/hub/git-clone.md")
+    ]
+
+
+def test_resolved_pages_in_memory_get_nav_entries(plugin, tmp_path):
+    resolved = tmp_path / "resolved-cache"
+    refs = []
+    for name in ["git-clone", "lint"]:
+        hub = resolved / "hub" / "tekton" / "task" / name / "0.1"
+        hub.mkdir(parents=True)
+        _write_task(hub / f"{name}.yaml", name, "0.1")
+        refs.append(
+            {
+                "resolver": "hub",
+                "params": [
+                    {"name": "name", "value": name},
+                    {"name": "version", "value": "0.1"},
+                ],
+            }
+        )
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    _write_pipeline(docs / "ci.yaml", "ci", refs)
+    plugin.load_config(
+        {"markdown_output": "memory", "resolver_cache_dir": str(resolved)}
+    )
+    plugin.on_config({})
+    files = [File("ci.yaml", str(docs), str(tmp_path / "site"), False)]
+    config = {"docs_dir": str(docs), "site_dir": "", "use_directory_urls": False}
+
+    for _ in range(2):
+        plugin.on_files(Files(files), dict(config, nav=[]))
+        assert plugin.task_versions[""] == {
+            "git-clone": [("0.1", "resolved/hub/git-clone.md")],
+            "lint": [("0.1", "resolved/hub/lint.md")],
+        }
+    assert None not in plugin.nav_entries
+    assert len(plugin.nav_entries) == 3
+
+
+def test_task_ref_links_follow_new_task_pages(plugin, tmp_path):
+    plugin.load_config({})
+    plugin.on_config({})
+    _write_pipeline(tmp_path / "pipeline.yaml", "ci", [{"name": "build"}])
+    config = {"site_dir": "", "nav": []}
+
+    def build(names):
+        files = [File(n, str(tmp_path), str(tmp_path / "site"), False) for n in names]
+        plugin.on_files(Files(files), config)
+        return (tmp_path / "pipeline.md").read_text()
+
+    assert "`build`" in build(["pipeline.yaml"])
+
+    # The pipeline is unchanged but its reference now resolves
+    _write_task(tmp_path / "build.yaml", "build")
+    assert "[`build`](build.md)" in build(["pipeline.yaml", "build.yaml"])
+
+
+def test_task_pages_list_pipelines_using_them(plugin, tmp_path):
+    plugin.load_config({})
+    plugin.on_config({})
+    (tmp_path / "tasks").mkdir()
+    _write_task(tmp_path / "tasks" / "build.yaml", "build")
+    _write_task(tmp_path / "tasks" / "lint.yaml", "lint")
+    _write_pipeline(tmp_path / "ci.yaml", "ci", [{"name": "build"}, {"name": "build"}])
+    config = {"site_dir": "", "nav": []}
+
+    def build(names):
+        files = [File(n, str(tmp_path), str(tmp_path / "site"), False) for n in names]
+        plugin.on_files(Files(files), config)
+        return (tmp_path / "tasks" / "build.md").read_text()
+
+    page = build(["ci.yaml", "tasks/build.yaml", "tasks/lint.yaml"])
+    assert "## Used By" in page
+    assert "| [ci](../ci.md) | `run-0`, `run-1` |" in page
+    assert "## Used By" not in (tmp_path / "tasks" / "lint.md").read_text()
+
+    # A new pipeline is added to the unchanged task page
+    _write_pipeline(tmp_path / "cd.yaml", "cd", [{"name": "build"}])
+    page = build(["cd.yaml", "ci.yaml", "tasks/build.yaml", "tasks/lint.yaml"])
+    assert page.index("[cd](../cd.md)") < page.index("[ci](../ci.md)")
+
+    # And removed again when the pipeline is deleted
+    page = build(["ci.yaml", "tasks/build.yaml", "tasks/lint.yaml"])
+    assert "[cd]" not in page
+
+
+def test_split_documents_gives_each_resource_a_page(plugin, tmp_path):
+    plugin.load_config({"markdown_output": "memory", "split_documents": True})
+    plugin.on_config({})
+    documents = [
+        {"kind": "Task", "metadata": {"name": "build"}, "spec": {"steps": []}},
+        {"kind": "ConfigMap", "metadata": {"name": "build-config"}},
+        {"kind": "Task", "metadata": {"name": "test"}, "spec": {"steps": []}},
+        {
+            "kind": "Pipeline",
+            "metadata": {"name": "ci"},
+            "spec": {"tasks": [{"name": "run", "taskRef": {"name": "test"}}]},
+        },
+    ]
+    (tmp_path / "bundle.yaml").write_text(yaml.safe_dump_all(documents))
+    _write_task(tmp_path / "single.yaml", "lint")
+    files = [
+        File(name, str(tmp_path), str(tmp_path / "site"), False)
+        for name in ["bundle.yaml", "single.yaml"]
+    ]
+    config = {"site_dir": "", "nav": [{"Pipelines": []}, {"Tasks": []}]}
+
+    new_files = plugin.on_files(Files(files), config)
+
+    build = new_files.get_file_from_path("bundle/build.md").content_string
+    assert "# Task: build" in build
+    assert "# ConfigMap: build-config" in build
+    assert "# Task: test" not in build
+    pipeline = new_files.get_file_from_path("bundle/ci.md").content_string
+    assert "**Task Reference:** [`test`](test.md)" in pipeline
+    assert new_files.get_file_from_path("single.md") is not None
+    assert config["nav"] == [
+        {"Pipelines": [{"ci": "bundle/ci.md"}]},
+        {
+            "Tasks": [
+                {"build": "bundle/build.md"},
+                {"test": "bundle/test.md"},
+                {"lint": "single.md"},
+            ]
+        },
+    ]
+
+
+@pytest.mark.parametrize("yaml_loader", ["c", "python"])
+def test_mixed_bundles_and_lists_are_rendered(plugin, tmp_path, yaml_loader):
+    plugin.load_config({"markdown_output": "memory", "yaml_loader": yaml_loader})
+    plugin.on_config({})
+    (tmp_path / "bundle.yaml").write_text(
+        "kind: ConfigMap\n"
+        "metadata:\n  name: settings\n"
+        # Discarded documents are never constructed
+        "data: !vault secret/settings\n"
+        "---\n"
+        "kind: List\n"
+        "items:\n"
+        "- kind: Task\n  metadata:\n    name: build\n  spec:\n    steps: []\n"
+        "- kind: Secret\n  metadata:\n    name: token\n  data: !vault secret/token\n"
+        "- kind: Pipeline\n  metadata:\n    name: ci\n  spec:\n    tasks: []\n"
+    )
+    (tmp_path / "other.yaml").write_text("kind: ConfigMap\n---\nkind: Secret\n")
+    files = [
+        File(name, str(tmp_path), str(tmp_path / "site"), False)
+        for name in ["bundle.yaml", "other.yaml"]
+    ]
+
+    new_files = plugin.on_files(Files(files), {"site_dir": "", "nav": []})
+
+    page = new_files.get_file_from_path("bundle.md").content_string
+    titles = [line for line in page.splitlines() if line.startswith("# ")]
+    assert titles == [
+        "# ConfigMap: settings",
+        "# Task: build",
+        "# Secret: token",
+        "# Pipeline: ci",
+    ]
+    assert plugin.resource_index[str(tmp_path / "bundle.yaml")]["record"][
+        "resources"
+    ] == [["task", "build", ""], ["pipeline", "ci", ""]]
+    assert new_files.get_file_from_path("other.md") is None
+
+
+@pytest.mark.parametrize("yaml_loader", ["c", "python"])
+def test_other_documents_are_skipped_without_composing(
+    plugin, tmp_path, monkeypatch, yaml_loader
+):
+    plugin.load_config({"yaml_loader": yaml_loader})
+    plugin.on_config({})
+    data = (
+        "apiVersion: v1\n"
+        "data:\n"
+        + "".join(f"  key{i}: value {i}\n" for i in range(1000))
+        + "kind: ConfigMap\n"
+        "metadata:\n  name: settings\n"
+        "---\n"
+        "plain text\n"
+        "---\n"
+        # The kind of a list may follow its items
+        "items:\n"
+        "- kind: Secret\n  metadata:\n    name: token\n"
+        "  data: {a: b, image: &image golang:1.22}\n"
+        "- metadata:\n    name: build\n  kind: Task\n"
+        "  spec:\n    steps:\n    - image: *image\n"
+        "kind: List\n"
+    ).encode()
+    composed = []
+    compose_node = yaml.composer.Composer.compose_node
+
+    def count(composer, parent, index):
+        composed.append(composer.peek_event())
+        return compose_node(composer, parent, index)
+
+    monkeypatch.setattr(yaml.composer.Composer, "compose_node", count)
+
+    documents = list(plugin._load_yaml("bundle.yaml", data))
+
+    assert documents == [
+        {"kind": "ConfigMap", "metadata": {"name": "settings"}},
+        None,
+        {"kind": "Secret", "metadata": {"name": "token"}},
+        {
+            "metadata": {"name": "build"},
+            "kind": "Task",
+            "spec": {"steps": [{"image": "golang:1.22"}]},
+        },
+    ]
+    assert len(composed) < 40
+    # Small documents of other kinds are composed with pipelines and tasks
+    small = b"kind: Task\nspec:\n  steps: []\n" + b"# padding\n" * 50
+    assert plugin._skip_events(small + b"---\nkind: ConfigMap\n") == (
+        yaml_loader == "python"
+    )
+    assert not plugin._skip_events(small)
+
+
+def test_templates_dir_overrides_pages(plugin, tmp_path, caplog):
+    templates = tmp_path / "docs" / "templates"
+    templates.mkdir(parents=True)
+    (templates / "task.md.j2").write_text(
+        "Steps: {{ task.steps | map(attribute='name') | join(', ') }}\n"
+    )
+    plugin.load_config({"markdown_output": "memory", "templates_dir": "templates"})
+    plugin.on_config({"docs_dir": str(tmp_path / "docs")})
+    digest = plugin.render_settings_digest
+    task_file = tmp_path / "docs" / "task.yaml"
+    task_file.write_text(
+        yaml.safe_dump(
+            {
+                "kind": "Task",
+                "metadata": {"name": "build"},
+                "spec": {"steps": [{"name": "compile"}, {"name": "test"}]},
+            }
+        )
+    )
+    files = [File("task.yaml", str(tmp_path / "docs"), str(tmp_path / "site"), False)]
+
+    new_files = plugin.on_files(Files(files), {"site_dir": "", "nav": []})
+
+    assert new_files.get_file_from_path("task.md").content_string == (
+        "# Task: build\nSteps: compile, test\n\n---\n\n"
+    )
+
+    # A broken template falls back to the defaults and re-renders the pages
+    (templates / "task.md.j2").write_text("{% for %}")
+    plugin.on_config({"docs_dir": str(tmp_path / "docs")})
+
+    assert "Invalid page template" in caplog.text
+    assert plugin.render_settings_digest != digest
+    new_files = plugin.on_files(Files(files), {"site_dir": "", "nav": []})
+    assert "## Steps" in new_files.get_file_from_path("task.md").content_string
+
+
+def test_include_exclude_and_suffixes(plugin, tmp_path, caplog):
+    plugin.load_config(
+        {
+            "markdown_output": "memory",
+            "timing": True,
+            "include": ["tekton/**"],
+            "exclude": ["fixtures"],
+        }
+    )
+    plugin.on_config({})
+    for name in ["tekton/a.yaml", "tekton/b.yml", "tekton/fixtures/c.yaml", "d.yaml"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        _write_task(tmp_path / name, os.path.basename(name))
+    (tmp_path / "tekton" / "values.yml").write_text("kind: ConfigMap\n")
+    files = [
+        File(name, str(tmp_path), str(tmp_path / "site"), False)
+        for name in [
+            "tekton/a.yaml",
+            "tekton/b.yml",
+            "tekton/fixtures/c.yaml",
+            "d.yaml",
+            "tekton/values.yml",
+        ]
+    ]
+
+    new_files = plugin.on_files(Files(files), {"site_dir": "", "nav": []})
+
+    # Excluded files are not copied to the site
+    assert sorted(f.src_path for f in new_files) == ["tekton/a.md", "tekton/b.md"]
+    assert plugin.stats.counters["files_skipped_path"] == 2
+    assert plugin.stats.counters["files_skipped_kind"] == 1
+    assert "2 processed, 2 skipped by path, 1 skipped by kind" in caplog.text
+
+
+def test_search_index(plugin, tmp_path):
+    plugin.load_config(
+        {
+            "markdown_output": "memory",
+            "search_index": "assets/pipelines.json",
+            "search_page": "tools/search.md",
+        }
+    )
+    plugin.on_config({})
+    (tmp_path / "task.yaml").write_text(
+        yaml.safe_dump(
+            {
+                "kind": "Task",
+                "metadata": {"name": "build"},
+                "spec": {
+                    "params": [{"name": "revision"}],
+                    "results": [{"name": "digest"}],
+                    "stepTemplate": {"image": "alpine"},
+                    "steps": [{"image": "golang"}, {"image": "alpine"}, {}],
+                },
+            }
+        )
+    )
+    _write_pipeline(tmp_path / "pipeline.yaml", "ci", [{"name": "build"}])
+    files = [
+        File(name, str(tmp_path), str(tmp_path / "site"), True)
+        for name in ["pipeline.yaml", "task.yaml"]
+    ]
+    config = {
+        "docs_dir": str(tmp_path),
+        "site_dir": str(tmp_path / "site"),
+        "use_directory_urls": True,
+        "nav": [],
+    }
+
+    new_files = plugin.on_files(Files(files), config)
+    plugin.on_post_build(config)
+
+    with open(tmp_path / "site" / "assets" / "pipelines.json") as f:
+        index = json.load(f)
+    strings = index["strings"]
+    resources = {
+        column: [strings[i] for i in values]
+        for column, values in index["resources"].items()
+    }
+    assert resources == {
+        "kind": ["pipeline", "task"],
+        "name": ["ci", "build"],
+        "version": ["", ""],
+        "url": ["pipeline/", "task/"],
+    }
+    assert index["params"] == {"resource": [1], "name": [strings.index("revision")]}
+    assert [strings[i] for i in index["images"]["name"]] == ["golang", "alpine"]
+    assert index["workspaces"] == {"resource": [], "name": []}
+    page = new_files.get_file_from_path("tools/search.md").content_string
+    assert 'fetch("../../assets/pipelines.json")' in page
+    assert 'var root = "../../";' in page
+
+
+def test_image_inventory(plugin, tmp_path):
+    plugin.load_config(
+        {"markdown_output": "memory", "image_inventory": "reports/images.md"}
+    )
+    plugin.on_config({})
+    (tmp_path / "tasks").mkdir()
+    for name, task_version, images in [
+        ("build", "1.0", ["golang:1.22", "alpine:3.19"]),
+        ("build", "2.0", ["golang:1.23", "golang:1.23"]),
+        ("lint", "", ["golang:1.22"]),
+        # Unquoted version labels parse as dates
+        ("scan", datetime.date(2024, 1, 31), ["alpine:3.19"]),
+    ]:
+        (tmp_path / "tasks" / f"{name}-{task_version}.yaml").write_text(
+            yaml.safe_dump(
+                {
+                    "kind": "Task",
+                    "metadata": {
+                        "name": name,
+                        "labels": {"app.kubernetes.io/version": task_version},
+                    },
+                    "spec": {"steps": [{"image": image} for image in images]},
+                }
+            )
+        )
+    files = [
+        File(f"tasks/{name}", str(tmp_path), str(tmp_path / "site"), True)
+        for name in sorted(os.listdir(tmp_path / "tasks"))
+    ]
+    config = {
+        "docs_dir": str(tmp_path),
+        "site_dir": str(tmp_path / "site"),
+        "use_directory_urls": True,
+        "nav": [],
+    }
+
+    new_files = plugin.on_files(Files(files), config)
+
+    page = new_files.get_file_from_path("reports/images.md").content_string
+    assert "3 images of 2 repositories" in page
+    assert "[CSV](images.csv) or [JSON](images.json)" in page
+    assert (
+        "| `1.22` | 2 | [build v1.0](../tasks/build-1.0.md), [lint](../tasks/lint-.md) |"
+        in page
+    )
+    assert "| `1.23` | 2 | [build v2.0](../tasks/build-2.0.md) |" in page
+    images_json = new_files.get_file_from_path("reports/images.json")
+    assert images_json.url == "reports/images.json"
+    images = json.loads(images_json.content_string)
+    assert [(i["repository"], i["tag"], i["steps"]) for i in images] == [
+        ("alpine", "3.19", 2),
+        ("golang", "1.22", 2),
+        ("golang", "1.23", 2),
+    ]
+    assert images[0]["tasks"][0]["url"] == "tasks/build-1.0/"
+    assert images[0]["tasks"][1]["version"] == "2024-01-31"
+    rows = new_files.get_file_from_path("reports/images.csv").content_string
+    rows = rows.splitlines()
+    assert rows[0] == "repository,tag,task,version,steps,url"
+    assert "golang,1.22,lint,,1,tasks/lint-/" in rows
+    assert "alpine,3.19,scan,2024-01-31,1,tasks/scan-2024-01-31/" in rows
+
+
+def test_image_inventory_passes_strict_build(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "tasks").mkdir(parents=True)
+    (docs / "index.md").write_text("# Home\n")
+    (docs / "tasks" / "build.yaml").write_text(
+        yaml.safe_dump(
+            {
+                "kind": "Task",
+                "metadata": {"name": "build"},
+                "spec": {"steps": [{"image": "golang:1.22"}]},
+            }
+        )
+    )
+    (tmp_path / "mkdocs.yml").write_text(
+        yaml.safe_dump(
+            {
+                "site_name": "Test",
+                "strict": True,
+                "nav": [{"Home": "index.md"}],
+                "plugins": [
+                    {
+                        "pipeline-visualizer": {
+                            "markdown_output": "memory",
+                            "plantuml_graphs": False,
+                            "image_inventory": "reports/images.md",
+                        }
+                    }
+                ],
+            }
+        )
+    )
+
+    build_site(load_config(str(tmp_path / "mkdocs.yml")))
+
+    site = tmp_path / "site"
+    page = (site / "reports" / "images" / "index.html").read_text()
+    assert 'href="../images.csv"' in page
+    assert (site / "reports" / "images.csv").read_text().startswith("repository,")
+    assert json.loads((site / "reports" / "images.json").read_text())
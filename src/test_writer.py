@@ -0,0 +1,18 @@
+from .writer import MarkdownWriter
+
+
+def test_writer_joins_fragments():
+    out = MarkdownWriter()
+    out.write("# Title\n")
+    out.writelines(["a", "b"])
+
+    assert out.getvalue() == "# Title\nab"
+
+
+def test_writer_table_header():
+    out = MarkdownWriter()
+    out.table("## Results", ["Name", "Description"])
+
+    assert out.getvalue() == (
+        "## Results\n\n| Name | Description |\n| ---- | ----------- |\n"
+    )
@@ -1,10 +1,194 @@
+import io
 import os
+import re
+import csv
+import json
+import time
 import yaml
+import jinja2
+import shutil
 import logging
+import tempfile
+from functools import lru_cache
+from collections import deque
+from importlib import metadata
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 from mkdocs.plugins import BasePlugin
 from mkdocs.structure.files import File, Files
 from mkdocs.config import config_options
 from packaging import version
+from .cache import RenderCache, render_key
+from .writer import MarkdownWriter
+from .templates import PageTemplates
+from .plantuml import PlantUMLRenderer, diagram_key
+from .layout import render_svg
+from .dag import PipelineGraph
+from .nav import NavSection, find_sections
+from .paths import compile_path_filter
+from .resolvers import ResolverCache, resolver_key
+from .stats import NULL_STATS, BuildStats
+from .model import Pipeline, Task, image_reference, load_resource
+
+# Resource kinds the plugin renders pages for
+TEKTON_KINDS = ("pipeline", "task")
+
+# Placeholders written while rendering, resolved when pages are finalized
+_PLACEHOLDER = re.compile(r"<!-- pipeline-visualizer:(diagram|ref|usedby):\w+ -->")
+
+# Marks the end of the documents of a YAML stream
+_END = object()
+
+# Characters of resource names that are not used in page file names
+_PAGE_NAME = re.compile(r"[^\w.-]+")
+
+# Tables of the search index, besides the resources
+SEARCH_TABLES = ("params", "workspaces", "results", "images")
+# Bump when the layout of the search index changes
+SEARCH_FORMAT = 1
+
+# Bytes read from the head of a file to find the kind of its first document
+SNIFF_SIZE = 64 * 1024
+_TOP_LEVEL_KIND = re.compile(rb"kind:[ \t]*['\"]?([\w.-]*)['\"]?[ \t]*(?:#.*)?")
+# A pipeline or task kind anywhere in a file, also inside lists
+_TEKTON_KIND = re.compile(
+    rb"^[ \t-]*kind:[ \t]*['\"]?(?:pipeline|task)['\"]?[ \t]*(?:#.*)?\r?$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# A top-level kind that is not a pipeline or task, or a flow style document
+# whose kind cannot be told from its lines
+_OTHER_KIND = re.compile(
+    rb"^(?:[{\[]|['\"]?kind['\"]?[ \t]*:"
+    rb"(?![ \t]*['\"]?(?:pipeline|task)['\"]?[ \t]*(?:#.*)?\r?$))",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Lines starting a YAML document
+_DOCUMENT_START = re.compile(rb"^---(?=[ \t\r\n]|$)", re.MULTILINE)
+# Share of the bytes of a file in documents of other kinds from which the C
+# loader skips them event by event. Below it composing every document in C is
+# faster than composing the pipelines and tasks from events in Python.
+EVENT_SKIP_SHARE = 0.25
+
+# Fields kept of documents that are not pipelines or tasks, only their
+# title is rendered
+_TITLE_FIELDS = ("kind", "metadata")
+
+# mkdocs 1.6+ can serve pages from in-memory content
+_IN_MEMORY_FILES = (
+    getattr(getattr(File, "content_string", None), "fset", None) is not None
+)
+
+# Numeric and alphabetic parts of version labels that are not PEP 440
+_VERSION_PARTS = re.compile(r"\d+|[^\W\d_]+")
+
+try:
+    PLUGIN_VERSION = metadata.version("mkdocs-pipeline-visualizer")
+except metadata.PackageNotFoundError:
+    PLUGIN_VERSION = "unknown"
+
+
+@lru_cache(maxsize=None)
+def version_sort_key(resource_version):
+    """Return the sort key of a version label, newer versions sort higher.
+
+    PEP 440 versions sort above other labels such as ``release-7`` or
+    ``2024-01-31``, which are compared part by part with numbers compared
+    numerically. Resources without a version sort last.
+    """
+    if resource_version is None or resource_version == "":
+        return (0,)
+    resource_version = str(resource_version)
+    try:
+        return (2, version.Version(resource_version), resource_version)
+    except version.InvalidVersion:
+        parts = tuple(
+            (1, int(part)) if part.isdigit() else (0, part.lower())
+            for part in _VERSION_PARTS.findall(resource_version)
+        )
+        return (1, parts, resource_version)
+
+
+def _create_temp_file(directory):
+    """Return ``(fd, path)`` of a new hidden ``.tmp`` file in ``directory``.
+
+    Unlike ``tempfile.mkstemp`` the file is not private, it gets the
+    permissions ``open()`` would give it: the umask applies to mode 0666
+    without having to change the umask of the process to read it.
+    """
+    flags = os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    for _ in range(tempfile.TMP_MAX):
+        path = os.path.join(directory, f".{os.urandom(6).hex()}.tmp")
+        try:
+            return os.open(path, flags, 0o666), path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No unused temporary file name in {directory}")
+
+
+class _EventComposer(yaml.composer.Composer):
+    """Composes nodes from the events of a loader.
+
+    Events read ahead to find the kind of a document are put back in
+    ``pending`` and read again before the events of the loader.
+    """
+
+    def __init__(self, loader):
+        super().__init__()
+        self.loader = loader
+        self.pending = deque()
+        self.descend_resolver = loader.descend_resolver
+        self.ascend_resolver = loader.ascend_resolver
+        self.resolve = loader.resolve
+
+    def check_event(self, *choices):
+        event = self.peek_event()
+        return event is not None and (not choices or isinstance(event, choices))
+
+    def peek_event(self):
+        return self.pending[0] if self.pending else self.loader.peek_event()
+
+    def get_event(self):
+        return self.pending.popleft() if self.pending else self.loader.get_event()
+
+    def read_node(self):
+        """Return the events of the next node without composing it."""
+        events = []
+        depth = 0
+        while True:
+            event = self.get_event()
+            events.append(event)
+            if isinstance(event, (yaml.SequenceStartEvent, yaml.MappingStartEvent)):
+                depth += 1
+            elif isinstance(event, (yaml.SequenceEndEvent, yaml.MappingEndEvent)):
+                depth -= 1
+            if depth == 0:
+                return events
+
+    def skip_node(self):
+        """Consume the events of the next node without composing it.
+
+        Anchored nodes are composed, aliases in the rest of the document may
+        refer to them.
+        """
+        depth = 0
+        while True:
+            event = self.peek_event()
+            if (
+                isinstance(event, yaml.NodeEvent)
+                and not isinstance(event, yaml.AliasEvent)
+                and event.anchor is not None
+            ):
+                self.compose_node(None, None)
+            else:
+                self.get_event()
+                if isinstance(event, (yaml.SequenceStartEvent, yaml.MappingStartEvent)):
+                    depth += 1
+                elif isinstance(event, (yaml.SequenceEndEvent, yaml.MappingEndEvent)):
+                    depth -= 1
+            if depth == 0:
+                return
 
 
 class PipelineVisualizer(BasePlugin):
@@ -13,11 +197,44 @@ class PipelineVisualizer(BasePlugin):
         ("plantuml_graph_direction", config_options.Choice(["TB", "LR"], default="TB")),
         ("plantuml_theme", config_options.Type(str, default="_none_")),
         ("plantuml_graphs", config_options.Type(bool, default=True)),
+        (
+            "graph_backend",
+            config_options.Choice(["plantuml", "svg"], default="plantuml"),
+        ),
+        ("graph_transitive_reduction", config_options.Type(bool, default=True)),
+        ("plantuml_command", config_options.Type(str, default=None)),
+        ("plantuml_workers", config_options.Type(int, default=4)),
         ("nav_generation", config_options.Type(bool, default=True)),
         ("nav_section_pipelines", config_options.Type(str, default="Pipelines")),
         ("nav_section_tasks", config_options.Type(str, default="Tasks")),
         ("nav_pipeline_grouping_offset", config_options.Type(str, default=None)),
         ("nav_task_grouping_offset", config_options.Type(str, default=None)),
+        ("nav_max_versions", config_options.Type(int, default=0)),
+        ("split_documents", config_options.Type(bool, default=False)),
+        ("templates_dir", config_options.Type(str, default=None)),
+        (
+            "markdown_output",
+            config_options.Choice(["docs_dir", "memory"], default="docs_dir"),
+        ),
+        ("workers", config_options.Type(int, default=1)),
+        ("yaml_loader", config_options.Choice(["auto", "c", "python"], default="auto")),
+        ("max_file_size", config_options.Type(int, default=0)),
+        ("include", config_options.Type(list, default=[])),
+        ("exclude", config_options.Type(list, default=[])),
+        ("suffixes", config_options.Type(list, default=[".yaml", ".yml"])),
+        ("cache", config_options.Type(bool, default=False)),
+        (
+            "cache_dir",
+            config_options.Type(str, default=".cache/plugin/pipeline-visualizer"),
+        ),
+        ("cache_max_size", config_options.Type(int, default=100)),
+        ("timing", config_options.Type(bool, default=False)),
+        ("timing_report", config_options.Type(str, default=None)),
+        ("search_index", config_options.Type(str, default=None)),
+        ("search_page", config_options.Type(str, default=None)),
+        ("image_inventory", config_options.Type(str, default=None)),
+        ("resolver_cache_dir", config_options.Type(str, default=None)),
+        ("resolver_pages_dir", config_options.Type(str, default="resolved")),
         (
             "log_level",
             config_options.Choice(
@@ -28,11 +245,48 @@ class PipelineVisualizer(BasePlugin):
 
     def __init__(self):
         self.logger = logging.getLogger("mkdocs.plugins.pipeline_visualizer")
+        self.render_cache = None
+        self.render_settings_digest = None
+        self._staging_dir = None
+        self.files_written = self.files_unchanged = 0
+        self.files_skipped_path = 0
+        self.stats = NULL_STATS
+        self.search_data = None
+        self.resolvers = None
+        self._reset_state()
+
+    def _reset_state(self):
+        # State kept between rebuilds under `mkdocs serve`
+        self.resource_index = {}
+        self.nav_entries = {}
+        self.pipeline_versions, self.task_versions = {}, {}
+        # Sections filled in the nav of the previous build and their content,
+        # reused as long as no nav entry changed
+        self._nav_sections = ()
+        self._nav_content = ()
+        self._nav_dirty = True
+        # (kind, name, version) -> page, and (kind, name) -> newest (version, page)
+        self.page_index = {}
+        self.newest_pages = {}
+        self._page_index_changed = True
+        # Resolver reference key -> (kind, name, version) of the resolved task,
+        # and page -> record of resolved tasks without a page of their own
+        self.resolved_refs = {}
+        self.resolved_pages = {}
+        # (task name, task page) -> {(page, pipeline, version): [pipeline tasks]}
+        self.used_by = {}
+        self._used_by_changed = set()
+
+    def on_startup(self, *, command, dirty):
+        # Defining this hook keeps the plugin instance alive across rebuilds
+        self.logger.debug("Starting %s (dirty: %s)", command, dirty)
+
+    def on_shutdown(self):
+        if self._staging_dir is not None:
+            shutil.rmtree(self._staging_dir, ignore_errors=True)
+            self._staging_dir = None
 
     def on_config(self, config):
-        self.nav_task_grouping_offset = self._parse_grouping_offset(
-            self.config["nav_task_grouping_offset"]
-        )
         self.logger.setLevel(getattr(logging, self.config["log_level"]))
 
         if not self.logger.handlers:
@@ -44,6 +298,24 @@ class PipelineVisualizer(BasePlugin):
             self.logger.addHandler(handler)
         self.logger.propagate = False
 
+        self._apply_config(self._templates_dir(config))
+        render_settings_digest = json.dumps(self._render_settings(), sort_keys=True)
+        if render_settings_digest != self.render_settings_digest:
+            self._reset_state()
+            self.render_settings_digest = render_settings_digest
+        self.render_cache = None
+        self.plantuml_renderer = None
+        self.diagram_svgs = {}
+        self.logger.info(
+            "PipelineVisualizer plugin initialized with configuration: %s (YAML loader: %s)",
+            self.config,
+            self.yaml_loader.__name__,
+        )
+
+    def _apply_config(self, templates_dir=None):
+        self.nav_task_grouping_offset = self._parse_grouping_offset(
+            self.config["nav_task_grouping_offset"]
+        )
         self.plantuml_graph_direction = (
             "left to right direction"
             if self.config["plantuml_graph_direction"] == "LR"
@@ -51,16 +323,106 @@ class PipelineVisualizer(BasePlugin):
         )
         self.plantuml_theme = self.config["plantuml_theme"]
         self.plantuml_graphs = self.config["plantuml_graphs"]
+        self.plantuml_command = self.config["plantuml_command"]
+        self.graph_backend = self.config["graph_backend"]
+        self.graph_transitive_reduction = self.config["graph_transitive_reduction"]
         self.nav_generation = self.config["nav_generation"]
         self.nav_section_pipelines = self.config["nav_section_pipelines"]
         self.nav_section_tasks = self.config["nav_section_tasks"]
         self.nav_pipeline_grouping_offset = self._parse_grouping_offset(
             self.config["nav_pipeline_grouping_offset"]
         )
-        self.logger.info(
-            "PipelineVisualizer plugin initialized with configuration: %s", self.config
+        self.nav_max_versions = self.config["nav_max_versions"]
+        self.split_documents = self.config["split_documents"]
+        self.markdown_output = self.config["markdown_output"]
+        self.workers = self.config["workers"] or os.cpu_count() or 1
+        self.max_file_size = self.config["max_file_size"] * 1024 * 1024
+        self.yaml_loader = self._select_yaml_loader(self.config["yaml_loader"])
+        self.suffixes = tuple(self.config["suffixes"])
+        self.path_filter = compile_path_filter(
+            self.config["include"], self.config["exclude"]
+        )
+        self.timing = self.config["timing"] or bool(self.config["timing_report"])
+        self.search_index = self.config["search_index"]
+        self.image_inventory = self.config["image_inventory"]
+        self.resolver_pages_dir = self.config["resolver_pages_dir"]
+        self.templates = self._load_templates(templates_dir)
+
+    def _templates_dir(self, config):
+        templates_dir = self.config["templates_dir"]
+        if templates_dir is None:
+            return None
+        return os.path.abspath(
+            os.path.join(config.get("docs_dir") or "", templates_dir)
         )
 
+    def _load_templates(self, templates_dir):
+        if templates_dir is not None and not os.path.isdir(templates_dir):
+            self.logger.warning("Templates directory %s does not exist", templates_dir)
+        try:
+            return PageTemplates(templates_dir)
+        except jinja2.TemplateError as e:
+            self.logger.error(
+                "Invalid page template in %s: %s. Using the default templates",
+                templates_dir,
+                e,
+            )
+            return PageTemplates()
+
+    def _select_yaml_loader(self, loader_name):
+        c_loader = getattr(yaml, "CSafeLoader", None)
+        if loader_name == "python":
+            return yaml.SafeLoader
+        if c_loader is None:
+            if loader_name == "c":
+                self.logger.warning(
+                    "PyYAML was built without libyaml, using the pure Python loader"
+                )
+            return yaml.SafeLoader
+        return c_loader
+
+    def _render_settings(self):
+        # Everything that influences the generated Markdown or nav metadata
+        return {
+            "plantuml_graph_direction": self.plantuml_graph_direction,
+            "plantuml_theme": self.plantuml_theme,
+            "plantuml_graphs": self.plantuml_graphs,
+            "plantuml_local": bool(self.plantuml_command),
+            "graph_backend": self.graph_backend,
+            "graph_transitive_reduction": self.graph_transitive_reduction,
+            "nav_pipeline_grouping_offset": self.nav_pipeline_grouping_offset,
+            "nav_task_grouping_offset": self.nav_task_grouping_offset,
+            "nav_generation": self.nav_generation,
+            "nav_max_versions": self.nav_max_versions,
+            "split_documents": self.split_documents,
+            "templates": self.templates.digest,
+            "search_index": bool(self.search_index),
+            "step_images": bool(self.search_index or self.image_inventory),
+        }
+
+    def _cache_dir(self, config):
+        return self._config_path(config, self.config["cache_dir"])
+
+    def _config_path(self, config, path):
+        """Return ``path`` made absolute relative to the directory of mkdocs.yml."""
+        if not os.path.isabs(path):
+            config_file = config.get("config_file_path") or ""
+            path = os.path.join(
+                os.path.dirname(os.path.abspath(config_file)) if config_file else "",
+                path,
+            )
+        return os.path.abspath(path)
+
+    def _open_render_cache(self, config):
+        if not self.config["cache"] or self.render_cache is not None:
+            return
+        self.render_cache = RenderCache(
+            self._cache_dir(config),
+            self.config["cache_max_size"] * 1024 * 1024,
+            PLUGIN_VERSION,
+        )
+        self.logger.debug("Using render cache in %s", self.render_cache.cache_dir)
+
     def _parse_grouping_offset(self, offset_str):
         if offset_str is None:
             return None
@@ -86,399 +448,1179 @@ class PipelineVisualizer(BasePlugin):
             return None
 
     def on_files(self, files, config):
+        self.stats = BuildStats() if self.timing else NULL_STATS
+        with self.stats.phase("on_files"):
+            new_files = self._on_files(files, config)
+        if self.stats.enabled:
+            for line in self.stats.summary():
+                self.logger.info(line)
+        return new_files
+
+    def on_post_build(self, config):
+        if self.search_data is not None:
+            index_path = os.path.join(config["site_dir"], self.search_index)
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            with open(index_path, "w") as f:
+                json.dump(self.search_data, f, separators=(",", ":"))
+            self.logger.info("Wrote search index to %s", index_path)
+
+        report = self.config["timing_report"]
+        if not report or not self.stats.enabled:
+            return
+        report_path = os.path.join(config["site_dir"], report)
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        with open(report_path, "w") as f:
+            json.dump(self.stats.to_dict(), f, indent=2)
+        self.logger.info("Wrote timing report to %s", report_path)
+
+    def _on_files(self, files, config):
         new_files = []
-        pipeline_versions, task_versions = {}, {}
+        self.files_written = self.files_unchanged = 0
+        self._open_render_cache(config)
+        resolver_cache_dir = self.config["resolver_cache_dir"]
+        # Resolved tasks are loaded again every build, the cache may change
+        self.resolvers = (
+            ResolverCache(
+                self._config_path(config, resolver_cache_dir), self.yaml_loader
+            )
+            if resolver_cache_dir
+            else None
+        )
 
+        sources = self._source_files(files)
+        source_paths = {f.src_path for f in sources}
+        yaml_paths = [f.abs_src_path for f in sources]
+        rendered = self._render_yaml_files(yaml_paths)
+        if self.plantuml_command:
+            self._render_diagrams(config, rendered.values())
+
+        skipped_by_kind = sum(
+            1 for record, _ in rendered.values() if record and record["kind"] is None
+        )
+        self.stats.count("files_skipped_kind", skipped_by_kind)
+        self.logger.info(
+            "YAML files: %d processed, %d skipped by path, %d skipped by kind",
+            len(sources) - skipped_by_kind,
+            self.files_skipped_path,
+            skipped_by_kind,
+        )
+
+        self._build_page_index(sources, rendered)
+
+        generated = {}
         for file in files:
-            if file.src_path.endswith(".yaml"):
+            if file.src_path in source_paths:
                 self.logger.debug("Processing YAML file: %s", file.src_path)
-                new_file = self._process_yaml_file(
-                    file, config, pipeline_versions, task_versions
-                )
-                if new_file:
+                for new_file in self._process_yaml_pages(
+                    file,
+                    config,
+                    self.pipeline_versions,
+                    self.task_versions,
+                    rendered[file.abs_src_path],
+                ):
                     new_files.append(new_file)
+                    generated[new_file.src_path] = new_file
                     self.logger.debug(
                         "Created new Markdown file: %s", new_file.src_path
                     )
-            else:
+            elif not file.src_path.endswith(self.suffixes):
                 new_files.append(file)
 
+        resolved_paths = set()
+        for page_path, record in self.resolved_pages.items():
+            new_file = self._generated_file(
+                config, page_path, self._page_content(record, page_path)
+            )
+            new_files.append(new_file)
+            generated[new_file.src_path] = new_file
+            # In-memory files have no abs_src_path, key them by their path in
+            # docs_dir like the YAML files they sit next to
+            nav_key = os.path.join(config["docs_dir"], page_path)
+            resolved_paths.add(nav_key)
+            if self.nav_generation:
+                self._update_nav_entries(
+                    nav_key,
+                    [record],
+                    [new_file],
+                    self.pipeline_versions,
+                    self.task_versions,
+                )
+
+        self._forget_removed_files(set(yaml_paths) | resolved_paths)
+
+        if self.nav_generation and self.nav_max_versions > 0:
+            for new_file in self._version_index_files(config):
+                new_files.append(new_file)
+                generated[new_file.src_path] = new_file
+
+        self.search_data = None
+        if self.search_index:
+            with self.stats.phase("search_index"):
+                self.search_data = self._search_data(sources, rendered, generated)
+            if self.config["search_page"]:
+                new_file = self._search_page_file(config)
+                new_files.append(new_file)
+                generated[new_file.src_path] = new_file
+
+        if self.image_inventory:
+            with self.stats.phase("image_inventory"):
+                image_data = self._image_data(sources, rendered, generated)
+                inventory_files = self._image_inventory_files(config, image_data)
+            for new_file in inventory_files:
+                new_files.append(new_file)
+                generated[new_file.src_path] = new_file
+
+        # Pages written by a previous build are discovered again by mkdocs
+        new_files = [f for f in new_files if generated.get(f.src_path, f) is f]
+
         if self.nav_generation:
-            self._update_navigation(config["nav"], pipeline_versions, task_versions)
+            # Empty the sections filled by the previous build so they are found
+            # again instead of getting duplicated, `mkdocs serve` passes a
+            # freshly loaded nav on every rebuild instead
+            for section in self._nav_sections:
+                section.clear()
+            if self._nav_dirty:
+                self._update_navigation(
+                    config["nav"], self.pipeline_versions, self.task_versions
+                )
+                self._nav_dirty = False
+            else:
+                self._restore_navigation(config["nav"])
+
+        if self.render_cache is not None:
+            self.logger.info(
+                "Render cache: %d hits, %d misses",
+                self.render_cache.hits,
+                self.render_cache.misses,
+            )
+            self.render_cache.prune()
 
+        self.logger.info(
+            "Markdown files: %d written, %d unchanged",
+            self.files_written,
+            self.files_unchanged,
+        )
         self.logger.info("File processing complete.")
         return Files(new_files)
 
-    def _process_yaml_file(self, file, config, pipeline_versions, task_versions):
-        resources = self._load_yaml(file.abs_src_path)
-        if not resources:
-            self.logger.warning("Failed to load YAML file: %s", file.abs_src_path)
-            return None
+    def _source_files(self, files):
+        """Return the YAML files to render, matched on their path alone.
 
-        kind = resources[0].get("kind", "").lower()
-        if kind not in ["pipeline", "task"]:
-            self.logger.debug(
-                "Skipping file %s: not a pipeline or task", file.abs_src_path
-            )
-            return None
+        Files with one of ``suffixes`` are matched against the ``include``
+        and ``exclude`` globs, so excluded files are never opened. Like files
+        of other kinds, they are not copied to the site. Files with other
+        suffixes are left to mkdocs.
+        """
+        sources = []
+        self.files_skipped_path = 0
+        for file in files:
+            src_path = file.src_path
+            if not src_path.endswith(self.suffixes):
+                continue
+            if self.path_filter(src_path.replace(os.sep, "/")):
+                sources.append(file)
+            else:
+                self.files_skipped_path += 1
+        self.stats.count("files_skipped_path", self.files_skipped_path)
+        return sources
 
-        self.logger.info("Processing %s: %s", kind, file.abs_src_path)
-        new_file = self._create_markdown_file(
-            file, config, self._generate_markdown_content(resources)
+    def _process_yaml_file(
+        self, file, config, pipeline_versions, task_versions, rendered=None
+    ):
+        """Return the first page generated for a YAML file, or ``None``."""
+        new_files = self._process_yaml_pages(
+            file, config, pipeline_versions, task_versions, rendered
         )
+        return new_files[0] if new_files else None
+
+    def _process_yaml_pages(
+        self, file, config, pipeline_versions, task_versions, rendered=None
+    ):
+        if rendered is None:
+            rendered = self._render_yaml_file(file.abs_src_path)
+        record, changed = rendered
+        if not record or not record["kind"]:
+            self.stats.count("files_skipped")
+            self._remove_version_entry(
+                file.abs_src_path, pipeline_versions, task_versions
+            )
+            return []
+
+        pages = self._record_pages(record, file.src_path)
+        new_files = []
+        for page_path, page in pages:
+            if self.markdown_output == "memory":
+                new_file = self._virtual_markdown_file(
+                    file, config, self._page_content(page, page_path), page_path
+                )
+            elif (
+                changed
+                or (self._page_index_changed and "refs" in page)
+                or page_path in self._used_by_changed
+                or not os.path.exists(os.path.join(file.src_dir, page_path))
+            ):
+                new_file = self._create_markdown_file(
+                    file, config, self._page_content(page, page_path), page_path
+                )
+            else:
+                self.files_unchanged += 1
+                new_file = self._markdown_file(file, config, page_path)
+            new_files.append(new_file)
 
         if self.nav_generation:
-            self._add_to_versions(
-                resources[0], new_file, kind, pipeline_versions, task_versions
+            self._update_nav_entries(
+                file.abs_src_path,
+                [page for _, page in pages],
+                new_files,
+                pipeline_versions,
+                task_versions,
             )
 
-        return new_file
+        return new_files
 
-    def _load_yaml(self, file_path):
+    def _update_nav_entries(
+        self, file_path, pages, new_files, pipeline_versions, task_versions
+    ):
+        """Add the pages generated from ``file_path`` to the versions dicts,
+        replacing the entries of the previous build when they changed."""
+        nav_entries = tuple(
+            (page["kind"], page["name"], page["version"], new_file.src_path)
+            for page, new_file in zip(pages, new_files)
+        )
+        previous = self.nav_entries.get(file_path, ())
+        if tuple(entry[:4] for entry in previous) == nav_entries:
+            return
+        self._remove_version_entry(file_path, pipeline_versions, task_versions)
+        self.nav_entries[file_path] = tuple(
+            nav_entry
+            + (
+                self._add_version_entry(
+                    *nav_entry[:3],
+                    new_file,
+                    pipeline_versions,
+                    task_versions,
+                ),
+            )
+            for nav_entry, new_file in zip(nav_entries, new_files)
+        )
+        self._nav_dirty = True
+
+    def _record_pages(self, record, src_path):
+        """Return ``(page path, page)`` pairs of the pages of a record.
+
+        Records of files split into a page per resource hold the pages in
+        ``pages``, they are written to a directory named after the file.
+        Other records are a page themselves.
+        """
+        if "pages" not in record:
+            return [(self._markdown_path(src_path), record)]
+        directory = os.path.splitext(self._markdown_path(src_path))[0]
+        return [
+            (os.path.join(directory, page["page"]), page) for page in record["pages"]
+        ]
+
+    def _render_yaml_file(self, file_path):
+        """Return ``(record, changed)`` for a YAML file.
+
+        A record holds the resource ``kind`` (``None`` for files that are not
+        pipelines or tasks), the ``name`` and ``version`` used for navigation
+        and the generated Markdown ``content``. Records are looked up in the
+        in-memory resource index first, then in the render cache, and only
+        rendered when both miss. ``changed`` is ``False`` when the record is
+        the same as the one produced by the previous build.
+        """
+        record, changed, job = self._lookup_record(file_path)
+        if job is not None:
+            record = self._render_job(file_path, job[1])
+            self._store_record(job, record)
+        return record, changed
+
+    def _render_job(self, file_path, data):
+        if not self.stats.enabled:
+            return self._build_record(file_path, self._load_yaml(file_path, data))
+        start = time.perf_counter()
+        record = self._build_record(file_path, self._load_yaml(file_path, data))
+        self.stats.file_time(file_path, time.perf_counter() - start)
+        return record
+
+    def _render_yaml_files(self, file_paths):
+        """Render several YAML files, fanning cache misses out to ``workers``.
+
+        Returns a dict of file path to ``(record, changed)``. Rendering happens
+        in worker processes; everything touching plugin state stays here.
+        """
+        rendered = {}
+        jobs = []
+        with self.stats.phase("lookup"):
+            for file_path in file_paths:
+                record, changed, job = self._lookup_record(file_path)
+                rendered[file_path] = (record, changed)
+                if job is not None:
+                    jobs.append(job)
+        self.stats.count("files_seen", len(file_paths))
+        self.stats.count("files_rendered", len(jobs))
+
+        workers = min(self.workers, len(jobs))
+        if workers > 1:
+            self.logger.info("Rendering %d files with %d workers", len(jobs), workers)
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(dict(self.config), self.templates.directory),
+            ) as executor:
+                results = executor.map(
+                    _render_in_worker,
+                    [(file_path, data) for file_path, data, _, _ in jobs],
+                    chunksize=max(1, len(jobs) // (workers * 4)),
+                )
+                for job, (record, worker_stats) in zip(jobs, results):
+                    if worker_stats is not None:
+                        self.stats.merge(worker_stats)
+                    self._store_record(job, record)
+                    rendered[job[0]] = (record, True)
+        else:
+            for job in jobs:
+                record = self._render_job(job[0], job[1])
+                self._store_record(job, record)
+                rendered[job[0]] = (record, True)
+        return rendered
+
+    def _lookup_record(self, file_path):
+        """Return ``(record, changed, job)``, ``job`` is set when rendering is needed."""
         try:
-            with open(file_path, "r") as f:
-                return list(yaml.safe_load_all(f))
+            stat = os.stat(file_path)
+        except OSError as e:
+            self.logger.error("Error reading YAML file %s: %s", file_path, e)
+            return None, True, None
+
+        entry = self.resource_index.get(file_path)
+        if (
+            entry is not None
+            and entry["mtime"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            return entry["record"], False, None
+
+        kind = self._sniff_kind(file_path)
+        # Bundles may hold pipelines and tasks after other documents, and the
+        # kind of a large document may come after the head
+        mixed = kind is not None and kind not in TEKTON_KINDS
+        if mixed and self.max_file_size and stat.st_size > self.max_file_size:
+            return self._skip_non_tekton(file_path, kind, stat), True, None
+
+        if self.max_file_size and stat.st_size > self.max_file_size:
+            self.logger.warning(
+                "Skipping file %s: size %d bytes exceeds max_file_size",
+                file_path,
+                stat.st_size,
+            )
+            self.resource_index.pop(file_path, None)
+            return None, True, None
+
+        try:
+            with open(file_path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            self.logger.error("Error reading YAML file %s: %s", file_path, e)
+            return None, True, None
+        self.stats.count("bytes_read", len(data))
+        if mixed and not _TEKTON_KIND.search(data):
+            return self._skip_non_tekton(file_path, kind, stat), True, None
+
+        key = render_key(data, self.render_settings_digest)
+        if entry is not None and entry["key"] == key:
+            entry["mtime"], entry["size"] = stat.st_mtime_ns, stat.st_size
+            return entry["record"], False, None
+
+        job = (file_path, data, key, stat)
+        if self.render_cache is not None:
+            record = self.render_cache.get(key)
+            if record is not None:
+                self.logger.debug("Render cache hit: %s", file_path)
+                self._store_record(job, record, cache=False)
+                return record, True, None
+        return None, True, job
+
+    def _skip_non_tekton(self, file_path, kind, stat):
+        self.logger.debug(
+            "Skipping file %s: kind '%s' is not a pipeline or task", file_path, kind
+        )
+        record = {"kind": None}
+        self._store_record((file_path, None, None, stat), record, cache=False)
+        return record
+
+    def _sniff_kind(self, file_path):
+        """Return the lowercased top-level ``kind`` of the first document.
+
+        Only the first ``SNIFF_SIZE`` bytes are read. Returns ``""`` when the
+        first document, or the part of it that was read, has no top-level kind
+        and ``None`` when it cannot be told without a full parse.
+        """
+        try:
+            with open(file_path, "rb") as f:
+                head = f.read(SNIFF_SIZE + 1)
+        except OSError:
+            return None
+        truncated = len(head) > SNIFF_SIZE
+        lines = head[:SNIFF_SIZE].splitlines()
+        if truncated:
+            # The last line may be cut short
+            lines.pop()
+        in_document = False
+        for line in lines:
+            if line.startswith(b"---") or line.startswith(b"..."):
+                if in_document:
+                    return ""
+                continue
+            line = line.lstrip(b"\xef\xbb\xbf")
+            if not line.strip() or line.startswith((b"#", b"%", b" ", b"\t")):
+                continue
+            in_document = True
+            match = _TOP_LEVEL_KIND.fullmatch(line.rstrip(b"\r"))
+            if match:
+                return match.group(1).decode("utf-8", "replace").lower()
+            if line.startswith((b"kind", b"{", b"[", b"'", b'"', b"?", b"!", b"&")):
+                # Unusual syntax or flow style, leave it to the parser
+                return None
+        return "" if in_document else None
+
+    def _store_record(self, job, record, cache=True):
+        file_path, _, key, stat = job
+        if record is None:
+            self.resource_index.pop(file_path, None)
+            return
+        if cache and self.render_cache is not None:
+            self.render_cache.put(key, record)
+        self.resource_index[file_path] = {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "key": key,
+            "record": record,
+        }
+
+    def _render_diagrams(self, config, rendered):
+        if self.plantuml_renderer is None:
+            self.plantuml_renderer = PlantUMLRenderer(
+                self.plantuml_command,
+                self.config["plantuml_workers"],
+                os.path.join(self._cache_dir(config), "plantuml"),
+            )
+        sources = [
+            source
+            for record, _ in rendered
+            if record
+            for page in record.get("pages", (record,))
+            for source in page.get("diagrams", {}).values()
+        ]
+        self.diagram_svgs = self.plantuml_renderer.render(sources)
+
+    def _build_page_index(self, files, rendered):
+        """Index the page of every rendered resource in one pass over the records.
+
+        References to tasks fetched by resolvers are looked up in the resolver
+        cache, resolved tasks without a page of their own are indexed with a
+        page below ``resolver_pages_dir``. Task references of all records are
+        then resolved against the index once, to count the unresolved ones
+        and to build the inverted index of the pipelines using each task page.
+        """
+        page_index = {}
+        newest_pages = {}
+        records = []
+        for file in files:
+            record = rendered[file.abs_src_path][0]
+            if not record or not record["kind"]:
+                continue
+            for page, page_record in self._record_pages(record, file.src_path):
+                records.append((page_record, page))
+                for resource in page_record.get("resources", ()):
+                    self._index_page(page_index, newest_pages, *resource, page)
+
+        resolved_refs, resolved_pages = self._resolve_task_refs(
+            records, page_index, newest_pages
+        )
+        self._page_index_changed = (
+            page_index != self.page_index or resolved_refs != self.resolved_refs
+        )
+        self.page_index = page_index
+        self.newest_pages = newest_pages
+        self.resolved_refs = resolved_refs
+        self.resolved_pages = resolved_pages
+
+        resolved = unresolved = 0
+        used_by = {}
+        for record, page in records:
+            for ref in record.get("refs", {}).values():
+                kind, name, ref_version = self._ref_target(ref)
+                pipeline_task, *owner = ref[3:6]
+                target = self._resolve_ref(kind, name, ref_version)
+                if target is None:
+                    unresolved += 1
+                    self.logger.debug(
+                        "Unresolved task reference in %s: %s", record["name"], name
+                    )
+                    continue
+                resolved += 1
+                users = used_by.setdefault((name, target), {})
+                users.setdefault((page, *owner), []).append(pipeline_task)
+
+        # Task pages whose list of users changed since the previous build
+        self._used_by_changed = {
+            key[1]
+            for key in set(used_by) | set(self.used_by)
+            if used_by.get(key) != self.used_by.get(key)
+        }
+        self.used_by = used_by
+        self.stats.count("refs_resolved", resolved)
+        self.stats.count("refs_unresolved", unresolved)
+        if resolved or unresolved:
+            self.logger.info(
+                "Task references: %d resolved, %d unresolved", resolved, unresolved
+            )
+
+    def _index_page(self, page_index, newest_pages, kind, name, resource_version, page):
+        page_index.setdefault((kind, name, resource_version), page)
+        newest = newest_pages.get((kind, name))
+        if newest is None or version_sort_key(resource_version) > version_sort_key(
+            newest[0]
+        ):
+            newest_pages[(kind, name)] = (resource_version, page)
+
+    def _resolve_task_refs(self, records, page_index, newest_pages):
+        """Look up the tasks of resolver references in the resolver cache.
+
+        Returns the ``(kind, name, version)`` of the task every found
+        reference resolves to, and the records of resolved tasks that have no
+        page yet by their page, which are added to the page index.
+        """
+        resolved_refs, resolved_pages = {}, {}
+        if self.resolvers is None:
+            return resolved_refs, resolved_pages
+        seen = set()
+        page_names = {}
+        with self.stats.phase("resolvers"):
+            for record, _ in records:
+                for ref in record.get("refs", {}).values():
+                    if len(ref) < 7:
+                        continue
+                    resolver, params = ref[6]
+                    key = resolver_key(resolver, params)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    document = self.resolvers.resolve(resolver, params)
+                    if document is None:
+                        continue
+                    task = Task(document)
+                    target = ("task", self._resource_name(task), task.version)
+                    resolved_refs[key] = target
+                    if target in page_index:
+                        continue
+                    out = MarkdownWriter()
+                    self._write_markdown_content(out, [task])
+                    page_record = self._page_record(task, out, [list(target)], [], [])
+                    page = os.path.join(
+                        self.resolver_pages_dir,
+                        resolver,
+                        self._page_name(
+                            page_record, page_names.setdefault(resolver, set())
+                        ),
+                    )
+                    resolved_pages[page] = page_record
+                    self._index_page(page_index, newest_pages, *target, page)
+        self.stats.count("resolver_files_loaded", self.resolvers.files_loaded)
+        self.logger.info(
+            "Resolver references: %d of %d found in %s",
+            len(resolved_refs),
+            len(seen),
+            self.resolvers.directory,
+        )
+        return resolved_refs, resolved_pages
+
+    def _ref_target(self, ref):
+        """Return the ``(kind, name, version)`` a reference links to.
+
+        References fetched by a resolver link to the task they resolve to
+        when it was found in the resolver cache.
+        """
+        if len(ref) > 6:
+            target = self.resolved_refs.get(resolver_key(*ref[6]))
+            if target is not None:
+                return target
+        return ref[0], ref[1], ref[2]
+
+    def _resolve_ref(self, kind, name, ref_version):
+        """Return the page of the referenced resource, matching the version
+        when it is known and the newest version otherwise."""
+        if ref_version:
+            page = self.page_index.get((kind, name, ref_version))
+            if page is not None:
+                return page
+        newest = self.newest_pages.get((kind, name))
+        return newest[1] if newest is not None else None
+
+    def _page_content(self, record, page_path):
+        diagrams = record.get("diagrams", {})
+        refs = record.get("refs", {})
+        used_by = record.get("used_by", {})
+        if not diagrams and not refs and not used_by:
+            return record["content"]
+
+        def replace(match):
+            placeholder = match.group(0)
+            if placeholder in diagrams:
+                return self._diagram_html(diagrams[placeholder])
+            if placeholder in refs:
+                return self._ref_link(refs[placeholder], page_path)
+            if placeholder in used_by:
+                return self._used_by_table(used_by[placeholder], page_path)
+            return placeholder
+
+        # One pass over the page for all placeholders
+        return _PLACEHOLDER.sub(replace, record["content"])
+
+    def _diagram_html(self, source):
+        svg = self.diagram_svgs.get(source)
+        if svg is None:
+            # Leave failed diagrams to the PlantUML markdown extension
+            return f"```plantuml\n{source}```"
+        return f'<div class="pipeline-graph">{svg}</div>'
+
+    def _ref_link(self, ref, page_path):
+        kind, name, ref_version = self._ref_target(ref)
+        target = self._resolve_ref(kind, name, ref_version)
+        if target is None:
+            return f"`{name if name is not None else 'Not specified'}`"
+        link = os.path.relpath(target, os.path.dirname(page_path) or ".")
+        return f"[`{name}`]({link.replace(os.sep, '/')})"
+
+    def _used_by_table(self, task_name, page_path):
+        users = self.used_by.get((task_name, page_path))
+        if not users:
+            return ""
+        out = MarkdownWriter()
+        out.table("## Used By", ["Pipeline", "Tasks"])
+        directory = os.path.dirname(page_path) or "."
+        for (page, pipeline, pipeline_version), pipeline_tasks in sorted(
+            users.items(), key=lambda u: (u[0][1], version_sort_key(u[0][2]))
+        ):
+            title = f"{pipeline} v{pipeline_version}" if pipeline_version else pipeline
+            link = os.path.relpath(page, directory).replace(os.sep, "/")
+            tasks = ", ".join(f"`{task}`" for task in pipeline_tasks)
+            out.write(f"| [{title}]({link}) | {tasks} |\n")
+        out.write("\n")
+        return out.getvalue()
+
+    def _forget_removed_files(self, seen):
+        for file_path in set(self.resource_index) - seen:
+            self.logger.debug("Removing deleted file from index: %s", file_path)
+            del self.resource_index[file_path]
+        for file_path in set(self.nav_entries) - seen:
+            self._remove_version_entry(
+                file_path, self.pipeline_versions, self.task_versions
+            )
+
+    def _build_record(self, file_path, documents):
+        """Render the documents of a YAML file into a record.
+
+        ``documents`` is consumed lazily, each resource is rendered as soon
+        as it is parsed so only one document is held in memory at a time.
+        Documents that are not pipelines or tasks only get a title, on the
+        page of the pipeline or task they are next to. With
+        ``split_documents`` every pipeline and task of a file that holds
+        several of them gets a page of its own, listed in ``pages``.
+        """
+        # [first pipeline or task, writer, resources] of every page
+        pages = []
+        loaded = False
+        try:
+            for document in documents:
+                loaded = True
+                if not isinstance(document, dict):
+                    continue
+                with self.stats.phase("model"):
+                    resource = load_resource(document)
+                document = None
+                tekton = isinstance(resource, (Pipeline, Task))
+                if not pages or (tekton and self.split_documents and pages[-1][0]):
+                    pages.append([None, MarkdownWriter(), [], [], []])
+                page = pages[-1]
+                if tekton:
+                    if page[0] is None:
+                        page[0] = resource
+                        if len(pages) == 1:
+                            self.logger.info(
+                                "Processing %s: %s",
+                                str(resource.kind).lower(),
+                                file_path,
+                            )
+                    page[2].append(
+                        [
+                            str(resource.kind).lower(),
+                            self._resource_name(resource),
+                            resource.version,
+                        ]
+                    )
+                    if self.search_index:
+                        page[3].append(self._search_fields(resource))
+                    if self.search_index or self.image_inventory:
+                        page[4].append(
+                            resource.step_images if isinstance(resource, Task) else []
+                        )
+                with self.stats.phase("render"):
+                    self._write_markdown_content(page[1], [resource])
         except yaml.YAMLError as e:
             self.logger.error("Error parsing YAML file %s: %s", file_path, e)
             return None
 
-    def _create_markdown_file(self, original_file, config, content):
-        md_file_path = original_file.abs_src_path.replace(".yaml", ".md")
-        os.makedirs(os.path.dirname(md_file_path), exist_ok=True)
+        if not loaded:
+            self.logger.warning("Failed to load YAML file: %s", file_path)
+            return None
+        if not pages or pages[0][0] is None:
+            self.logger.debug("Skipping file %s: not a pipeline or task", file_path)
+            return {"kind": None}
+        if len(pages) == 1:
+            return self._page_record(*pages[0])
+        records = [self._page_record(*page) for page in pages]
+        page_names = set()
+        for page_record in records:
+            page_record["page"] = self._page_name(page_record, page_names)
+        return {
+            "kind": records[0]["kind"],
+            "name": records[0]["name"],
+            "version": records[0]["version"],
+            "pages": records,
+        }
+
+    def _page_record(self, resource, out, resources, search, images):
+        record = {
+            "kind": str(resource.kind).lower(),
+            "name": self._resource_name(resource),
+            "version": resource.version,
+            "content": out.getvalue(),
+            # Every pipeline and task of the page, for the page index
+            "resources": resources,
+        }
+        if out.diagrams:
+            record["diagrams"] = out.diagrams
+        if out.refs:
+            record["refs"] = out.refs
+        if out.used_by:
+            record["used_by"] = out.used_by
+        if search:
+            record["search"] = search
+        if images:
+            # [image, steps] of the step images of every resource
+            record["images"] = images
+        return record
+
+    def _search_fields(self, resource):
+        """Return the names of the parameters, workspaces and results of a
+        pipeline or task, indexed for search."""
+        return [
+            [str(param.name) for param in resource.params],
+            [str(workspace.name) for workspace in resource.workspaces],
+            [str(result.name) for result in getattr(resource, "results", ())],
+        ]
+
+    def _page_name(self, record, page_names):
+        """Return a file name for a page of a split file, unique in ``page_names``."""
+        base = _PAGE_NAME.sub("-", record["name"])
+        candidates = [base]
+        if record["version"]:
+            candidates.append(f"{base}-{_PAGE_NAME.sub('-', str(record['version']))}")
+        n = 2
+        while True:
+            for candidate in candidates:
+                if candidate not in page_names:
+                    page_names.add(candidate)
+                    return f"{candidate}.md"
+            candidates = [f"{base}-{n}"]
+            n += 1
+
+    def _load_yaml(self, file_path, data=None):
+        """Yield the documents of a YAML file one at a time, as they are parsed.
+
+        The items of ``List`` documents are yielded in their place. Only
+        pipelines and tasks are constructed in full, other documents are
+        reduced to their kind and metadata. Files with a large enough share of
+        other kinds are read event by event and the bodies of other documents
+        are skipped without composing them, see ``_skip_events``. Other files
+        are composed by the loader directly, which is faster for pipelines and
+        tasks. Documents that are not mappings are yielded as ``None`` when
+        read event by event. Parse errors are raised as ``yaml.YAMLError``
+        while iterating.
+        """
+        if data is None:
+            with open(file_path, "rb") as f:
+                data = f.read()
+        loader = self.yaml_loader(data)
+        try:
+            if self._skip_events(data):
+                yield from self._load_events(loader)
+                return
+            while True:
+                with self.stats.phase("parse"):
+                    if not loader.check_node():
+                        return
+                    nodes = self._dispatch_node(loader.get_node())
+                for node in nodes:
+                    with self.stats.phase("parse"):
+                        document = loader.construct_document(node)
+                    yield document
+        finally:
+            loader.dispose()
+
+    def _skip_events(self, data):
+        """Tell if the documents of other kinds in ``data`` are worth skipping
+        event by event, estimated from the top-level kinds of its documents."""
+        if not _OTHER_KIND.search(data):
+            return False
+        if self.yaml_loader is yaml.SafeLoader:
+            # The pure Python loader composes in Python anyway
+            return True
+        starts = [0, *(m.start() for m in _DOCUMENT_START.finditer(data)), len(data)]
+        other = sum(
+            end - start
+            for start, end in zip(starts, starts[1:])
+            if _OTHER_KIND.search(data, start, end)
+        )
+        return other >= EVENT_SKIP_SHARE * len(data)
+
+    def _load_events(self, loader):
+        composer = _EventComposer(loader)
+        with self.stats.phase("parse"):
+            composer.get_event()
+        while True:
+            with self.stats.phase("parse"):
+                if composer.check_event(yaml.StreamEndEvent):
+                    return
+                composer.get_event()
+                composer.anchors = {}
+                nodes = self._dispatch_events(composer)
+                composer.get_event()
+            for node in nodes:
+                if node is None:
+                    yield None
+                    continue
+                with self.stats.phase("parse"):
+                    document = loader.construct_document(node)
+                yield document
+
+    def _dispatch_events(self, composer):
+        """Return the nodes to construct for the next node of ``composer``.
+
+        Like ``_dispatch_node`` but on events: the fields of a mapping are
+        read up to its ``kind``, pipelines and tasks are then composed in
+        full. Of other mappings only the title fields and the items of
+        ``List`` documents are composed, the other fields are skipped.
+        """
+        if not composer.check_event(yaml.MappingStartEvent):
+            composer.skip_node()
+            return [None]
+        read = [composer.get_event()]
+        kind = ""
+        while not composer.check_event(yaml.MappingEndEvent):
+            key = composer.peek_event()
+            if isinstance(key, yaml.ScalarEvent) and key.value == "kind":
+                read.append(composer.get_event())
+                value = composer.peek_event()
+                if isinstance(value, yaml.ScalarEvent):
+                    kind = value.value.lower()
+                break
+            read.extend(composer.read_node())
+            read.extend(composer.read_node())
+        composer.pending.extendleft(reversed(read))
+        if kind in TEKTON_KINDS:
+            return [composer.compose_node(None, None)]
+
+        start = composer.get_event()
+        title = []
+        items = None
+        while not composer.check_event(yaml.MappingEndEvent):
+            key = composer.peek_event()
+            field = key.value if isinstance(key, yaml.ScalarEvent) else None
+            if field in _TITLE_FIELDS:
+                title.append(
+                    (
+                        composer.compose_node(None, None),
+                        composer.compose_node(None, None),
+                    )
+                )
+            elif field == "items" and kind.endswith("list"):
+                composer.skip_node()
+                if not composer.check_event(yaml.SequenceStartEvent):
+                    composer.skip_node()
+                    continue
+                composer.get_event()
+                items = []
+                while not composer.check_event(yaml.SequenceEndEvent):
+                    items.extend(
+                        node
+                        for node in self._dispatch_events(composer)
+                        if node is not None
+                    )
+                composer.get_event()
+            else:
+                composer.skip_node()
+                composer.skip_node()
+        composer.get_event()
+        if items is not None:
+            return items
+        tag = start.tag
+        if tag is None or tag == "!":
+            tag = composer.resolve(yaml.MappingNode, None, start.implicit)
+        return [yaml.MappingNode(tag, title)]
+
+    def _dispatch_node(self, node):
+        """Return the nodes to construct for a document node.
+
+        ``List`` nodes are flattened into their items and nodes that are not
+        pipelines or tasks are replaced by a node of their title fields.
+        """
+        if not isinstance(node, yaml.MappingNode):
+            return [node]
+        fields = {
+            key.value: value
+            for key, value in node.value
+            if isinstance(key, yaml.ScalarNode)
+        }
+        kind_node = fields.get("kind")
+        kind = kind_node.value if isinstance(kind_node, yaml.ScalarNode) else ""
+        kind = kind.lower()
+        items = fields.get("items")
+        if kind.endswith("list") and isinstance(items, yaml.SequenceNode):
+            return [
+                dispatched
+                for item in items.value
+                for dispatched in self._dispatch_node(item)
+            ]
+        if kind in TEKTON_KINDS:
+            return [node]
+        return [
+            yaml.MappingNode(
+                node.tag,
+                [
+                    (key, value)
+                    for key, value in node.value
+                    if isinstance(key, yaml.ScalarNode) and key.value in _TITLE_FIELDS
+                ],
+            )
+        ]
+
+    def _markdown_path(self, path):
+        return os.path.splitext(path)[0] + ".md"
 
-        with open(md_file_path, "w") as f:
-            f.write(content)
-        self.logger.debug("Created Markdown file: %s", md_file_path)
+    def _create_markdown_file(self, original_file, config, content, page_path=None):
+        if page_path is None:
+            md_file_path = self._markdown_path(original_file.abs_src_path)
+        else:
+            md_file_path = os.path.join(original_file.src_dir, page_path)
+        with self.stats.phase("write"):
+            if self._write_if_changed(md_file_path, content):
+                self.logger.debug("Created Markdown file: %s", md_file_path)
+        return self._markdown_file(original_file, config, page_path)
+
+    def _write_if_changed(self, path, content):
+        """Atomically write ``content`` to ``path`` unless it already holds it."""
+        data = content.encode("utf-8")
+        try:
+            if os.path.getsize(path) == len(data):
+                with open(path, "rb") as f:
+                    if f.read() == data:
+                        self.files_unchanged += 1
+                        return False
+        except OSError:
+            pass
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = _create_temp_file(directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.files_written += 1
+        self.stats.count("bytes_written", len(data))
+        return True
+
+    def _markdown_file(self, original_file, config, page_path=None):
         return File(
-            original_file.src_path.replace(".yaml", ".md"),
+            page_path or self._markdown_path(original_file.src_path),
             original_file.src_dir,
             original_file.dest_dir,
             config["site_dir"],
         )
 
-    def _generate_markdown_content(self, resources):
+    def _virtual_markdown_file(self, original_file, config, content, page_path=None):
+        return self._in_memory_file(
+            self._markdown_file(original_file, config, page_path), config, content
+        )
+
+    def _in_memory_file(self, new_file, config, content):
+        if _IN_MEMORY_FILES:
+            new_file.content_string = content
+            return new_file
+
+        # Older mkdocs versions can only read pages from disk, stage them
+        # outside docs_dir so the source tree and file watcher stay untouched
+        if self._staging_dir is None:
+            self._staging_dir = tempfile.mkdtemp(prefix="pipeline-visualizer-")
+        staged_file = File(
+            new_file.src_path,
+            self._staging_dir,
+            new_file.dest_dir,
+            config["site_dir"],
+        )
+        self._write_if_changed(staged_file.abs_src_path, content)
+        return staged_file
+
+    def _resource_name(self, resource):
+        return resource.name if resource.name is not None else "Unnamed Resource"
+
+    def _generate_markdown_content(self, documents):
+        out = MarkdownWriter()
+        self._write_markdown_content(out, [load_resource(d) for d in documents])
+        return self._page_content(
+            {
+                "content": out.getvalue(),
+                "diagrams": out.diagrams,
+                "refs": out.refs,
+                "used_by": out.used_by,
+            },
+            "",
+        )
+
+    def _write_markdown_content(self, out, resources):
         self.logger.debug(
             "Generating Markdown content for %d resources", len(resources)
         )
-        markdown_content = ""
         for resource in resources:
-            kind = resource.get("kind", "")
-            metadata = resource.get("metadata", {})
-            spec = resource.get("spec", {})
-            resource_name = metadata.get("name", "Unnamed Resource")
-            resource_version = metadata.get("labels", {}).get(
-                "app.kubernetes.io/version", ""
+            resource_name = self._resource_name(resource)
+            resource_version = f" v{resource.version}" if resource.version else ""
+            out.write(f"# {resource.kind}: {resource_name}{resource_version}\n")
+
+            refs_before = len(out.refs)
+            if isinstance(resource, Pipeline):
+                self._visualize_pipeline(out, resource)
+            elif isinstance(resource, Task):
+                self._visualize_task(out, resource)
+            # Remember which pipeline each new reference belongs to
+            for ref in islice(out.refs.values(), refs_before, None):
+                ref[4:4] = [resource_name, resource.version]
+
+            out.write("\n---\n\n")
+
+    def _visualize_pipeline(self, out, pipeline):
+        self.logger.debug("Visualizing pipeline")
+        out.writelines(
+            self.templates.pipeline.generate(
+                pipeline=pipeline,
+                graph=lambda: (
+                    self._fragment(
+                        out, self._make_graph_from_tasks, pipeline.tasks, pipeline.final
+                    )
+                    if self.plantuml_graphs
+                    else ""
+                ),
+                task_ref=lambda task, name: self._fragment(
+                    out, self._write_task_ref, task, name
+                ),
             )
-            if resource_version:
-                resource_version = f" v{resource_version}"
-
-            markdown_content += f"# {kind}: {resource_name}{resource_version}\n"
+        )
 
-            if kind.lower() == "pipeline":
-                markdown_content += self._visualize_pipeline(spec)
-            elif kind.lower() == "task":
-                markdown_content += self._visualize_task(metadata, spec)
+    def _visualize_task(self, out, task):
+        task_name = task.name if task.name is not None else "Unnamed Task"
+        self.logger.debug("Visualizing task: %s", task_name)
+        out.writelines(
+            self.templates.task.generate(
+                task=task,
+                task_name=task_name,
+                usage=self._usage_yaml(task, task_name),
+                used_by=lambda name: self._fragment(out, self._write_used_by, name),
+            )
+        )
 
-            markdown_content += "\n---\n\n"
-        return markdown_content
+    def _fragment(self, out, write, *args):
+        """Return what ``write`` writes for a template, keeping its placeholders."""
+        part = out.fragment()
+        write(part, *args)
+        return part.getvalue()
 
-    def _visualize_pipeline(self, spec):
-        self.logger.debug("Visualizing pipeline")
-        markdown_content = ""
-        tasks = spec.get("tasks", [])
-        final = spec.get("finally", [])
-        if self.plantuml_graphs:
-            markdown_content += self._make_graph_from_tasks(tasks, final)
-        markdown_content += self._visualize_parameters(spec.get("params", []))
-        markdown_content += self._visualize_workspaces(spec.get("workspaces", []))
-        markdown_content += self._visualize_tasks(tasks)
-        if final:
-            markdown_content += "## Finally\n\n"
-            markdown_content += self._visualize_tasks(final)
-        return markdown_content
-
-    def _visualize_task(self, metadata, spec):
-        self.logger.debug("Visualizing task: %s", metadata.get("name", "Unnamed Task"))
-        markdown_content = (
-            f"## Description\n>{spec.get('description','No description')}\n"
-        )
-        markdown_content += self._visualize_parameters(spec.get("params", []))
-        markdown_content += self._visualize_results(spec.get("results", []))
-        markdown_content += self._visualize_workspaces(spec.get("workspaces", []))
-        markdown_content += self._visualize_step_template(spec.get("stepTemplate", []))
-        markdown_content += self._visualize_steps(spec.get("steps", []))
-        markdown_content += self._visualize_usage(metadata, spec)
-        return markdown_content
-
-    def _make_graph_from_tasks(self, tasks, final):
+    def _make_graph_from_tasks(self, out, tasks, final):
         self.logger.debug(
             "Generating graph from %d tasks and %d final tasks", len(tasks), len(final)
         )
-        markdown_content = f"```plantuml\n@startuml\n{self.plantuml_graph_direction}\n!theme {self.plantuml_theme}\n"
+        graph = self._pipeline_graph(tasks, final)
 
-        task_dependencies = {}
-        all_tasks = set()
-        tasks_with_dependencies = set()
+        if self.graph_backend == "svg":
+            direction = self.config["plantuml_graph_direction"]
+            svg = render_svg(graph.nodes, graph.edges(), direction)
+            out.write(f'<div class="pipeline-graph">{svg}</div>\n')
+            return
 
-        # Collect all task dependencies
-        for task in tasks:
-            task_name = task.get("name", "Unnamed Task")
-            run_after = task.get("runAfter", [])
-            all_tasks.add(task_name)
-
-            if not run_after:
-                markdown_content += f'"Start" --> {task_name}\n'
-            else:
-                tasks_with_dependencies.add(task_name)
-                for dependency in run_after:
-                    task_dependencies.setdefault(dependency, []).append(task_name)
-
-        # Generate the task dependency diagram
-        for task, dependencies in task_dependencies.items():
-            for dependency in dependencies:
-                markdown_content += f'"{task}" --> {dependency}\n'
-
-        # Determine the end tasks (tasks with no dependencies after them)
-        end_tasks = all_tasks - set(task_dependencies.keys())
-
-        # Connect end tasks to the first "finally" task
-        if final:
-            finally_task = final[0].get("name", "Finally Task")
-            for end_task in end_tasks:
-                markdown_content += f'"{end_task}" --> {finally_task}\n'
-            for i in range(len(final) - 1):
-                current_task = final[i].get("name", "Finally Task")
-                next_task = final[i + 1].get("name", "Finally Task")
-                markdown_content += f'"{current_task}" --> "{next_task}"\n'
-
-        markdown_content += "@enduml\n```\n"
-        return markdown_content
-
-    def _visualize_step_template(self, template):
-        if not template:
-            return ""
-        markdown_content = "## Step template\n\n"
-
-        if template.get("env", []):
-            markdown_content += self._table_with_header(
-                "**Environment Variables:**", ["Name", "Value"]
-            )
-            for var in template.get("env", []):
-                name = var.get("name", "Unnamed Variable")
-                value = var.get("value", "")
-                if value:
-                    markdown_content += f"| `{name}` | `{value}` |\n"
-
-        if template.get("envFrom", []):
-            markdown_content += self._table_with_header(
-                "**Environment from config:**", ["Name", "Type"]
-            )
-            for value_from in template.get("envFrom"):
-                if value_from.get("configMapRef", {}):
-                    cm_name = value_from.get("configMapRef").get(
-                        "name", "Not specified"
-                    )
-                    markdown_content += f"| `{cm_name}` | ConfigMap |\n"
-                if value_from.get("secretRef", {}):
-                    secret_name = value_from.get("secretRef").get(
-                        "name", "Not specified"
-                    )
-                    markdown_content += f"| `{secret_name}` | Secret |\n"
-
-        markdown_content += "\n"
-        return markdown_content
-
-    def _visualize_parameters(self, params):
-        if not params:
-            return "## Parameters\n\nNo parameters\n"
-        markdown_content = self._table_with_header(
-            "## Parameters", ["Name", "Type", "Description", "Default"]
-        )
-        for param in params:
-            name = param.get("name", "Unnamed Parameter")
-            param_type = param.get("type", "String")
-            description = self._format_value(
-                param.get("description", "No description provided.")
-            )
-            default = param.get("default", "")
-            markdown_content += f"| `{name}` | `{param_type}` | {description} | {f'`{default}`' if default else ''} |\n"
-        return markdown_content + "\n"
-
-    def _visualize_workspaces(self, workspaces):
-        if not workspaces:
-            return ""
-        markdown_content = self._table_with_header(
-            "## Workspaces", ["Name", "Description", "Optional"]
-        )
-        for workspace in workspaces:
-            name = workspace.get("name", "Unnamed Workspace")
-            description = self._format_value(workspace.get("description", ""))
-            optional = workspace.get("optional", False)
-            markdown_content += f"| `{name}` | {description} | { optional } |\n"
-        return markdown_content + "\n"
-
-    def _visualize_tasks(self, tasks):
-        markdown_content = "## Tasks\n\n"
-        for task in tasks:
-            task_name = task.get("name", "Unnamed Task")
-            markdown_content += f"### {task_name}\n\n"
-
-            # Task Reference
-            task_ref = task.get("taskRef", {})
-            markdown_content += (
-                f"**Task Reference:** `{task_ref.get('name', 'Not specified')}`\n\n"
+        diagram = MarkdownWriter()
+        diagram.write(
+            f"@startuml\n{self.plantuml_graph_direction}\n!theme {self.plantuml_theme}\n"
+        )
+        for source, target in graph.edges():
+            diagram.write(f'"{source}" --> "{target}"\n')
+        diagram.write("@enduml\n")
+        self._write_diagram(out, diagram.getvalue())
+
+    def _pipeline_graph(self, tasks, final):
+        graph = PipelineGraph.from_tasks(
+            [
+                (task.name if task.name is not None else "Unnamed Task", task.run_after)
+                for task in tasks
+            ],
+            [task.name if task.name is not None else "Finally Task" for task in final],
+        )
+        for task_name, dependency in graph.dangling:
+            self.logger.warning(
+                "Task '%s' runs after unknown task '%s'", task_name, dependency
             )
-
-            # Run After
-            run_after = task.get("runAfter", [])
-            if run_after:
-                markdown_content += "**Runs After:**\n\n"
-                for dep in run_after:
-                    markdown_content += f"- `{dep}`\n"
-                markdown_content += "\n"
-            markdown_content += self._visualize_common_elements(task)
-
-            # Parameters
-            params = task.get("params", [])
-            if params:
-                markdown_content += self._table_with_header(
-                    "**Parameters**", ["Name", "Value"]
-                )
-                for param in params:
-                    name = param.get("name", "Unnamed Parameter")
-                    value = self._format_value(param.get("value", ""))
-                    if "<br>" in str(value) or "<ul>" in str(value) or value == "":
-                        markdown_content += f"| `{name}` | {value} |\n"
-                    else:
-                        markdown_content += f"| `{name}` | `{value}` |\n"
-                markdown_content += "\n"
-
-            # Workspaces
-            workspaces = task.get("workspaces", [])
-            if workspaces:
-                markdown_content += self._table_with_header(
-                    "**Workspaces**", ["Name", "Workspace"]
-                )
-                for workspace in workspaces:
-                    name = workspace.get("name", "Unnamed Workspace")
-                    workspace_name = workspace.get("workspace", "Not specified")
-                    markdown_content += f"| `{name}` | `{workspace_name}` |\n"
-                markdown_content += "\n"
-
-            # Environment Variables
-            markdown_content += self._visualize_environment(task.get("env", []))
-            markdown_content += "---\n\n"
-
-        return markdown_content
-
-    def _visualize_steps(self, steps):
-        markdown_content = "## Steps\n\n"
-        for i, step in enumerate(steps, 1):
-            step_name = step.get("name", f"Step {i}")
-            markdown_content += f"### {step_name}\n\n"
-            markdown_content += self._visualize_common_elements(step)
-            # Image
-            image = step.get("image", "Not specified")
-            markdown_content += f"**Image:** `{image}`\n\n"
-
-            # Script
-            script = step.get("script", "")
-            if script:
-                markdown_content += f"**Script:**\n\n```{self._get_script_type(script)}\n{script}\n```\n\n"
-
-            # Command
-            command = step.get("command", [])
-            if command:
-                markdown_content += "**Command:**\n\n```console\n"
-                markdown_content += " ".join(command)
-                markdown_content += "\n```\n\n"
-
-            # Args
-            args = step.get("args", [])
-            if args:
-                markdown_content += "**Arguments:**\n\n```shell\n"
-                markdown_content += " ".join(args)
-                markdown_content += "\n```\n\n"
-
-            # Environment Variables
-            markdown_content += self._visualize_environment(step.get("env", []))
-        return markdown_content
-
-    def _visualize_common_elements(self, spec):
-        markdown_content = ""
-
-        # Timeout
-        timeout = spec.get("timeout")
-        if timeout:
-            markdown_content += f"**Timeout:** `{timeout}`\n\n"
-
-        # When
-        when = spec.get("when", [])
-        if when:
-            markdown_content += "**When Expressions:**\n\n"
-            for condition in when:
-                input = condition.get("input", "")
-                operator = condition.get("operator", "")
-                values = condition.get("values", [])
-                markdown_content += f"- Input: `{input}`, Operator: `{operator}`, Values: `{', '.join(values)}`\n"
-            markdown_content += "\n"
-
-        # Retries
-        retries = spec.get("retries")
-        if retries:
-            markdown_content += f"**Retries:** `{retries}`\n\n"
-
-        return markdown_content
-
-    def _visualize_results(self, results):
-        if not results:
-            return "\n"
-        markdown_content = self._table_with_header(
-            "## Results", ["Name", "Description"]
-        )
-        for result in results:
-            name = result.get("name", "Unnamed Result")
-            description = result.get("description", "No description provided.")
-            markdown_content += f"| `{name}` | {description} |\n"
-        return markdown_content + "\n"
-
-    def _visualize_environment(self, env):
-        if not env:
-            return ""
-        markdown_content = self._table_with_header(
-            "**Environment Variables:**", ["Name", "Value", "Source", "Optional"]
-        )
-        for var in env:
-            name = var.get("name", "Unnamed Variable")
-            value = var.get("value", "")
-            value_from = var.get("valueFrom", {})
-
-            if value:
-                markdown_content += f"| `{name}` | `{value}` |  |  |\n"
-            elif "configMapKeyRef" in value_from:
-                cm_name = value_from["configMapKeyRef"].get("name", "Not specified")
-                cm_key = value_from["configMapKeyRef"].get("key", "Not specified")
-                optional = value_from["configMapKeyRef"].get("optional", False)
-                markdown_content += f"| `{name}` | `{cm_name}:{cm_key}` | ConfigMap Reference | {optional} |\n"
-            elif "fieldRef" in value_from:
-                field_path = value_from["fieldRef"].get("fieldPath", "Not specified")
-                markdown_content += (
-                    f"| `{name}` | `{field_path}` | Field Reference | |\n"
-                )
-            elif "secretKeyRef" in value_from:
-                secret_name = value_from["secretKeyRef"].get("name", "Not specified")
-                secret_key = value_from["secretKeyRef"].get("key", "Not specified")
-                optional = value_from["secretKeyRef"].get("optional", False)
-                markdown_content += f"| `{name}` | `{secret_name}:{secret_key}` | Secret Reference | {optional} |\n"
-            else:
-                markdown_content += f"| `{name}` | Not specified | Unknown |\n"
-        markdown_content += "\n"
-        return markdown_content
-
-    def _visualize_usage(self, metadata, spec):
-        task_name = metadata.get("name", "Unnamed Task")
-        task_display_name = metadata.get("annotations", {}).get(
-            "tekton.dev/displayName", task_name
+        cycles = graph.find_cycles()
+        for cycle in cycles:
+            self.logger.warning("Tasks run after each other in a cycle: %s", cycle)
+        if self.graph_transitive_reduction and not cycles:
+            graph = graph.transitive_reduction()
+        return graph
+
+    def _write_diagram(self, out, source):
+        if not self.plantuml_command:
+            out.write(f"```plantuml\n{source}```\n")
+            return
+        # Rendered to SVG locally once all pages are generated
+        placeholder = f"<!-- pipeline-visualizer:diagram:{diagram_key(source)} -->"
+        out.diagrams[placeholder] = source
+        out.write(f"{placeholder}\n")
+
+    def _write_task_ref(self, out, task, pipeline_task):
+        if task.ref_name is None and task.resolver is None:
+            out.write(f"`{task.ref_label}`")
+            return
+        # Linked to the task page once all pages are indexed
+        placeholder = f"<!-- pipeline-visualizer:ref:{len(out.refs)} -->"
+        ref = ["task", task.ref_name, task.ref_version, pipeline_task]
+        if task.resolver is not None:
+            # Resolved against the resolver cache once all pages are indexed
+            ref.append(task.resolver)
+        out.refs[placeholder] = ref
+        out.write(placeholder)
+
+    def _write_used_by(self, out, task_name):
+        # Pipelines using the task are listed once all pages are indexed
+        placeholder = f"<!-- pipeline-visualizer:usedby:{len(out.used_by)} -->"
+        out.used_by[placeholder] = task_name
+        out.write(placeholder)
+
+    def _usage_yaml(self, task, task_name):
+        """Return the YAML of a minimal pipeline task using ``task``."""
+        task_display_name = (
+            task.display_name if task.display_name is not None else task_name
         )
 
         usage_yaml = {
@@ -486,14 +1628,14 @@ class PipelineVisualizer(BasePlugin):
             "taskRef": {"name": task_name},
             "runAfter": ["<TASK_NAME>"],
             "params": [
-                {"name": param["name"], "value": "<VALUE>"}
-                for param in spec.get("params", [])
-                if "default" not in param
+                {"name": param.name, "value": "<VALUE>"}
+                for param in task.params
+                if not param.has_default
             ],
             "workspaces": [
-                {"name": ws["name"], "workspace": "<WORKSPACE_NAME>"}
-                for ws in spec.get("workspaces", [])
-                if not ws.get("optional", False)
+                {"name": ws.name, "workspace": "<WORKSPACE_NAME>"}
+                for ws in task.workspaces
+                if not ws.optional
             ],
         }
 
@@ -501,66 +1643,30 @@ class PipelineVisualizer(BasePlugin):
             usage_yaml.pop("workspaces")
 
         yaml_str = yaml.dump([usage_yaml], default_flow_style=False)
-        usage = "\n".join("    " + line for line in yaml_str.splitlines())
-        return f"""
-## Usage
-
-This is the minimum configuration required to use the `{task_name}` task in your pipeline.
-
-```yaml
-{usage}
-```
-
-Placeholders should be replaced with the appropriate values for your specific use case. Refer to the task's documentation for more details on the available parameters and workspaces.
-The `runAfter` parameter is optional and only needed if you want to specify task dependencies for flow control.
-
-"""
-
-    def _format_value(self, value):
-        if isinstance(value, list):
-            value = "<ul>" + "".join(f"<li>`{v}`</li>" for v in value) + "</ul>"
-        elif isinstance(value, str) and "\n" in value:
-            value = value.replace("\n", "<br>")
-        return value
-
-    def _table_with_header(self, header, table_headers):
-        col_headers = "|"
-        under_line = "|"
-        for col in table_headers:
-            col_headers += f" {col} |"
-            under_line += f" { '-' * len(col) } |"
-        return f"{header}\n\n{col_headers}\n{under_line}\n"
-
-    def _get_script_type(self, script):
-
-        shebang_dict = {
-            "python": "python",
-            "ruby": "ruby",
-            "perl": "perl",
-            "node": "javascript",
-            "php": "php",
-            "bash": "bash",
-            "pwsh": "powershell",
-            "lua": "lua",
-        }
-        lines = script.splitlines()
-        if lines and lines[0].startswith("#!"):
-            first_line = lines[0]
-            for key in shebang_dict:
-                if key in first_line:
-                    return shebang_dict[key]
-
-        return "shell"
+        return "\n".join("    " + line for line in yaml_str.splitlines())
 
     def _add_to_versions(
         self, resource, new_file, kind, pipeline_versions, task_versions
     ):
         metadata = resource.get("metadata", {})
-        resource_name = metadata.get("name", "Unnamed Resource")
-        resource_version = metadata.get("labels", {}).get(
-            "app.kubernetes.io/version", ""
+        self._add_version_entry(
+            kind,
+            metadata.get("name", "Unnamed Resource"),
+            metadata.get("labels", {}).get("app.kubernetes.io/version", ""),
+            new_file,
+            pipeline_versions,
+            task_versions,
         )
 
+    def _add_version_entry(
+        self,
+        kind,
+        resource_name,
+        resource_version,
+        new_file,
+        pipeline_versions,
+        task_versions,
+    ):
         self.logger.debug(
             "Adding %s '%s' (version: %s) to versions dict",
             kind,
@@ -568,6 +1674,8 @@ The `runAfter` parameter is optional and only needed if you want to specify task
             resource_version,
         )
         versions_dict = pipeline_versions if kind == "pipeline" else task_versions
+        # Parse the version once, nav rebuilds reuse the memoized key
+        version_sort_key(resource_version)
 
         path_parts = new_file.src_path.split(os.sep)
         grouping_offset = (
@@ -594,106 +1702,329 @@ The `runAfter` parameter is optional and only needed if you want to specify task
         versions_dict[group_path][resource_name].append(
             (resource_version, new_file.src_path)
         )
+        return group_path
+
+    def _remove_version_entry(self, file_path, pipeline_versions, task_versions):
+        nav_entries = self.nav_entries.pop(file_path, None)
+        if nav_entries is None:
+            return
+        for kind, resource_name, resource_version, src_path, group_path in nav_entries:
+            self.logger.debug(
+                "Removing %s '%s' (version: %s) from versions dict",
+                kind,
+                resource_name,
+                resource_version,
+            )
+            versions_dict = pipeline_versions if kind == "pipeline" else task_versions
+            versions = versions_dict.get(group_path, {}).get(resource_name, [])
+            if (resource_version, src_path) in versions:
+                versions.remove((resource_version, src_path))
+            if not versions:
+                versions_dict.get(group_path, {}).pop(resource_name, None)
+                if not versions_dict.get(group_path, True):
+                    del versions_dict[group_path]
+        self._nav_dirty = True
 
     def _update_navigation(self, nav, pipeline_versions, task_versions):
+        with self.stats.phase("navigation"):
+            self._build_navigation(nav, pipeline_versions, task_versions)
+
+    def _build_navigation(self, nav, pipeline_versions, task_versions):
         self.logger.info("Updating navigation structure")
-        pipelines_section = self._find_or_create_section(
-            nav, self.nav_section_pipelines
-        )
-        tasks_section = self._find_or_create_section(nav, self.nav_section_tasks)
+        pipelines_section, tasks_section = self._nav_sections_of(nav)
 
         self._add_to_nav(pipelines_section, pipeline_versions)
         self._add_to_nav(tasks_section, task_versions)
+        self._nav_sections = (pipelines_section, tasks_section)
+        self._nav_content = (list(pipelines_section), list(tasks_section))
+
+    def _restore_navigation(self, nav):
+        """Fill the sections of ``nav`` with the content of the previous build."""
+        self.logger.debug("Navigation unchanged, reusing the previous sections")
+        self._nav_sections = self._nav_sections_of(nav)
+        for section, content in zip(self._nav_sections, self._nav_content):
+            section[:] = content
+
+    def _nav_sections_of(self, nav):
+        sections = self._find_or_create_sections(
+            nav, [self.nav_section_pipelines, self.nav_section_tasks]
+        )
+        return sections[self.nav_section_pipelines], sections[self.nav_section_tasks]
 
-    def _find_or_create_section(self, nav, section_name):
-        self.logger.debug("Finding or creating navigation section: %s", section_name)
-
-        def find_section_recursive(nav_item, section_name):
-            if isinstance(nav_item, list):
-                for item in nav_item:
-                    result = find_section_recursive(item, section_name)
-                    if result is not None:
-                        return result
-            elif isinstance(nav_item, dict):
-                for key, value in nav_item.items():
-                    if key == section_name and isinstance(value, list) and not value:
-                        return value
-                    result = find_section_recursive(value, section_name)
-                    if result is not None:
-                        return result
-            return None
-
-        result = find_section_recursive(nav, section_name)
-
-        if result is not None:
-            return result
-
-        new_section = {section_name: []}
-        nav.append(new_section)
-        return new_section[section_name]
+    def _find_or_create_sections(self, nav, section_names):
+        self.logger.debug(
+            "Finding or creating navigation sections: %s", ", ".join(section_names)
+        )
+        sections = find_sections(nav, section_names)
+        for section_name in section_names:
+            if section_name not in sections:
+                new_section = {section_name: []}
+                nav.append(new_section)
+                sections[section_name] = new_section[section_name]
+        return sections
 
     def _add_to_nav(self, nav_list, versions_dict):
         self.logger.debug("Adding items to navigation")
 
-        def semantic_version_key(version_tuple):
-            ver, _ = version_tuple
-            if not ver:
-                return version.parse("0.0.0")
-            try:
-                return version.parse(ver)
-            except version.InvalidVersion:
-                return version.parse("0.0.0")
-
+        root = NavSection.from_nav(nav_list)
         for group_path, resources in versions_dict.items():
-            if group_path:
-                current_level = self._find_or_create_nested_dict(
-                    nav_list, group_path.split(os.sep)
-                )
-            else:
-                current_level = nav_list
+            current_level = root.find(group_path.split(os.sep)) if group_path else root
 
             for resource_name, versions in resources.items():
-                sorted_versions = sorted(
-                    versions, key=semantic_version_key, reverse=True
-                )
+                sorted_versions = self._sorted_versions(versions)
                 if len(sorted_versions) == 1:
-                    current_level.append({resource_name: sorted_versions[0][1]})
-                else:
-                    resource_versions = []
-                    for v, path in sorted_versions:
-                        version_name = f"{resource_name} v{v}" if v else resource_name
-                        resource_versions.append({version_name: path})
-
-                    # Check if there's already an entry for this resource
-                    existing_entry = next(
+                    current_level.add_page(resource_name, sorted_versions[0][1])
+                    continue
+
+                nav_versions = [
+                    (f"{resource_name} v{v}" if v else resource_name, path)
+                    for v, path in sorted_versions
+                ]
+                if 0 < self.nav_max_versions < len(sorted_versions):
+                    nav_versions = nav_versions[: self.nav_max_versions]
+                    nav_versions.append(
                         (
-                            item
-                            for item in current_level
-                            if isinstance(item, dict) and resource_name in item
-                        ),
-                        None,
+                            "All versions",
+                            self._version_index_path(resource_name, sorted_versions),
+                        )
+                    )
+                current_level.add_versions(resource_name, nav_versions)
+        nav_list[:] = root.to_nav()
+
+    def _sorted_versions(self, versions):
+        """Return ``(version, path)`` pairs from the newest to the oldest."""
+        return sorted(versions, key=lambda v: version_sort_key(v[0]), reverse=True)
+
+    def _version_index_path(self, resource_name, sorted_versions):
+        directory = os.path.dirname(sorted_versions[0][1])
+        return os.path.join(directory, f"{resource_name}-versions.md")
+
+    def _version_index_files(self, config):
+        """Create the pages listing all versions of resources with more
+        versions than ``nav_max_versions``."""
+        index_files = []
+        for versions_dict in (self.pipeline_versions, self.task_versions):
+            for resources in versions_dict.values():
+                for resource_name, versions in resources.items():
+                    if len(versions) <= self.nav_max_versions:
+                        continue
+                    sorted_versions = self._sorted_versions(versions)
+                    src_path = self._version_index_path(resource_name, sorted_versions)
+                    content = self._version_index_content(
+                        resource_name, src_path, sorted_versions
                     )
+                    index_files.append(self._generated_file(config, src_path, content))
+        return index_files
+
+    def _generated_file(self, config, src_path, content):
+        """Return the file of a page generated at ``src_path`` in docs_dir."""
+        new_file = File(
+            src_path,
+            config["docs_dir"],
+            config["site_dir"],
+            config["use_directory_urls"],
+        )
+        if self.markdown_output == "memory":
+            return self._in_memory_file(new_file, config, content)
+        self._write_if_changed(new_file.abs_src_path, content)
+        return new_file
 
-                    if existing_entry:
-                        # If entry exists, append new versions
-                        existing_entry[resource_name].extend(resource_versions)
-                    else:
-                        # If no entry exists, create a new one
-                        current_level.append({resource_name: resource_versions})
+    def _search_data(self, sources, rendered, generated):
+        """Build the search index from the records of the rendered pages.
+
+        Strings are stored once in ``strings`` and referenced by their
+        position. ``resources`` holds a column per field of every pipeline
+        and task, each of the ``SEARCH_TABLES`` holds the position of the
+        resource and of the name of its entries.
+        """
+        strings = {}
+        resources = {"kind": [], "name": [], "version": [], "url": []}
+        tables = {table: {"resource": [], "name": []} for table in SEARCH_TABLES}
+        for file in sources:
+            record = rendered[file.abs_src_path][0]
+            if not record or not record["kind"]:
+                continue
+            for page_path, page in self._record_pages(record, file.src_path):
+                new_file = generated.get(page_path)
+                url = new_file.url if new_file is not None else ""
+                for summary, fields, images in zip(
+                    page["resources"], page.get("search", ()), page.get("images", ())
+                ):
+                    fields = [*fields, [image for image, _ in images]]
+                    resource = len(resources["kind"])
+                    for column, value in zip(resources, [*summary, url]):
+                        resources[column].append(
+                            strings.setdefault(str(value), len(strings))
+                        )
+                    for table, names in zip(SEARCH_TABLES, fields):
+                        for name in names:
+                            tables[table]["resource"].append(resource)
+                            tables[table]["name"].append(
+                                strings.setdefault(name, len(strings))
+                            )
+        self.logger.info(
+            "Search index: %d resources, %d strings",
+            len(resources["kind"]),
+            len(strings),
+        )
+        return {
+            "format": SEARCH_FORMAT,
+            "strings": list(strings),
+            "resources": resources,
+            **tables,
+        }
 
-    def _find_or_create_nested_dict(self, current_level, path_parts):
-        self.logger.debug(
-            "Finding or creating nested dict for path: %s", "/".join(path_parts)
-        )
-        for part in path_parts:
-            found = False
-            for item in current_level:
-                if isinstance(item, dict) and part in item:
-                    current_level = item[part]
-                    found = True
-                    break
-            if not found:
-                new_dict = {part: []}
-                current_level.append(new_dict)
-                current_level = new_dict[part]
-        return current_level
+    def _search_page_file(self, config):
+        src_path = self.config["search_page"]
+        new_file = File(
+            src_path,
+            config["docs_dir"],
+            config["site_dir"],
+            config["use_directory_urls"],
+        )
+        # Links in the index are relative to the site root
+        root = "../" * new_file.url.count("/")
+        content = self.templates.search.render(
+            index_url=root + self.search_index.replace(os.sep, "/"), root=root
+        )
+        return self._generated_file(config, src_path, content)
+
+    def _version_index_content(self, resource_name, src_path, sorted_versions):
+        out = MarkdownWriter()
+        out.write(f"# {resource_name}\n\n")
+        out.table("## Versions", ["Version", "Page"])
+        directory = os.path.dirname(src_path)
+        for v, path in sorted_versions:
+            link = os.path.relpath(path, directory).replace(os.sep, "/")
+            title = f"{resource_name} v{v}" if v else resource_name
+            out.write(f"| {v or '-'} | [{title}]({link}) |\n")
+        return out.getvalue()
+
+    def _image_data(self, sources, rendered, generated):
+        """Aggregate the step images of all tasks by repository and tag."""
+        images = {}
+        for file in sources:
+            record = rendered[file.abs_src_path][0]
+            if not record or not record["kind"]:
+                continue
+            for page_path, page in self._record_pages(record, file.src_path):
+                for (_, name, task_version), step_images in zip(
+                    page["resources"], page.get("images", ())
+                ):
+                    for image, steps in step_images:
+                        entry = images.get(image_reference(image))
+                        if entry is None:
+                            entry = images[image_reference(image)] = [0, {}]
+                        entry[0] += steps
+                        task = entry[1].setdefault((name, task_version), [page_path, 0])
+                        task[1] += steps
+
+        image_data = []
+        for (repository, tag), (steps, tasks) in sorted(
+            images.items(), key=lambda i: (i[0][0], version_sort_key(i[0][1]))
+        ):
+            image_data.append(
+                {
+                    "repository": repository,
+                    "tag": tag,
+                    "steps": steps,
+                    "tasks": [
+                        {
+                            "name": name,
+                            "version": task_version,
+                            "page": page_path,
+                            "url": (
+                                generated[page_path].url
+                                if page_path in generated
+                                else ""
+                            ),
+                            "steps": task_steps,
+                        }
+                        for (name, task_version), (page_path, task_steps) in sorted(
+                            tasks.items(),
+                            key=lambda t: (t[0][0], version_sort_key(t[0][1])),
+                        )
+                    ],
+                }
+            )
+        self.logger.info(
+            "Image inventory: %d images in %d repositories",
+            len(image_data),
+            len({image["repository"] for image in image_data}),
+        )
+        return image_data
+
+    def _image_inventory_files(self, config, image_data):
+        """Return the files of the inventory page and of its CSV and JSON
+        exports, generated next to the page so its links to them resolve."""
+        src_path = self.image_inventory
+        export = os.path.splitext(src_path)[0]
+        directory = os.path.dirname(src_path)
+        export_name = os.path.basename(export)
+        images = [
+            dict(
+                image,
+                tasks=[
+                    {
+                        "title": (
+                            f"{task['name']} v{task['version']}"
+                            if task["version"]
+                            else task["name"]
+                        ),
+                        "link": os.path.relpath(task["page"], directory or ".").replace(
+                            os.sep, "/"
+                        ),
+                        "steps": task["steps"],
+                    }
+                    for task in image["tasks"]
+                ],
+            )
+            for image in image_data
+        ]
+        content = self.templates.images.render(
+            images=images,
+            csv_url=f"{export_name}.csv",
+            json_url=f"{export_name}.json",
+        )
+        csv_content = io.StringIO()
+        writer = csv.writer(csv_content)
+        writer.writerow(["repository", "tag", "task", "version", "steps", "url"])
+        for image in image_data:
+            for task in image["tasks"]:
+                writer.writerow(
+                    [
+                        image["repository"],
+                        image["tag"],
+                        task["name"],
+                        task["version"],
+                        task["steps"],
+                        task["url"],
+                    ]
+                )
+        return [
+            self._generated_file(config, src_path, content),
+            self._generated_file(config, f"{export}.csv", csv_content.getvalue()),
+            self._generated_file(
+                config, f"{export}.json", json.dumps(image_data, indent=2)
+            ),
+        ]
+
+
+# Plugin instance used to render files inside worker processes
+_worker_plugin = None
+
+
+def _init_worker(plugin_config, templates_dir):
+    global _worker_plugin
+    _worker_plugin = PipelineVisualizer()
+    _worker_plugin.load_config(plugin_config)
+    _worker_plugin._apply_config(templates_dir)
+
+
+def _render_in_worker(job):
+    file_path, data = job
+    if not _worker_plugin.timing:
+        return _worker_plugin._render_job(file_path, data), None
+    # Timings of the job are sent back and merged into the build stats
+    _worker_plugin.stats = BuildStats()
+    return _worker_plugin._render_job(file_path, data), _worker_plugin.stats
@@ -0,0 +1,47 @@
+class MarkdownWriter:
+    """Collects Markdown fragments and joins them once.
+
+    Appending to a list keeps page generation linear in the size of the page,
+    unlike repeated string concatenation.
+
+    ``diagrams`` maps placeholders written to the page to the source of
+    diagrams that are rendered after all pages have been generated, and
+    ``refs`` maps placeholders to ``[kind, name, version, pipeline task,
+    pipeline, pipeline version]`` of referenced resources that are linked
+    once all pages are indexed, followed by ``[resolver, params]`` for
+    tasks fetched by a resolver, and ``used_by`` maps placeholders to the
+    name of a task whose users are listed there.
+    """
+
+    def __init__(self):
+        self._fragments = []
+        self.diagrams = {}
+        self.refs = {}
+        self.used_by = {}
+        self.write = self._fragments.append
+
+    def fragment(self):
+        """Return a writer for a part of the page that shares its placeholders."""
+        writer = MarkdownWriter()
+        writer.diagrams, writer.refs, writer.used_by = (
+            self.diagrams,
+            self.refs,
+            self.used_by,
+        )
+        return writer
+
+    def writelines(self, fragments):
+        for fragment in fragments:
+            self.write(fragment)
+
+    def table(self, header, table_headers):
+        self.write(f"{header}\n\n|")
+        for col in table_headers:
+            self.write(f" {col} |")
+        self.write("\n|")
+        for col in table_headers:
+            self.write(f" { '-' * len(col) } |")
+        self.write("\n")
+
+    def getvalue(self):
+        return "".join(self._fragments)